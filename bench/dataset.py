@@ -0,0 +1,71 @@
+import datetime
+import random
+import typing as tp
+from dataclasses import dataclass, field
+
+from proto import calendar_pb2
+
+
+DEFAULT_RULE_WEIGHTS = {
+    calendar_pb2.RepititionRule.NONE: 70,
+    calendar_pb2.RepititionRule.DAILY: 10,
+    calendar_pb2.RepititionRule.WEEKLY: 12,
+    calendar_pb2.RepititionRule.MONTHLY: 6,
+    calendar_pb2.RepititionRule.YEARLY: 2,
+}
+
+DURATIONS = [datetime.timedelta(minutes=minutes)
+             for minutes in (15, 30, 30, 45, 60, 60, 90, 120)]
+
+
+@dataclass
+class DatasetConfig:
+    users: int
+    events_per_user: int = 20
+    # Amount of participants besides the author is drawn from [0, max_participants]
+    max_participants: int = 5
+    rule_weights: tp.Dict[int, int] = field(
+        default_factory=lambda: dict(DEFAULT_RULE_WEIGHTS))
+    start: datetime.datetime = datetime.datetime(2023, 1, 2)
+    # Events start somewhere within this span after `start`
+    span: datetime.timedelta = datetime.timedelta(days=180)
+    seed: int = 0
+
+
+@dataclass
+class Dataset:
+    config: DatasetConfig
+    users: tp.List[str]
+    events: tp.List[calendar_pb2.Event]
+
+
+def username(i: int) -> str:
+    return f'user{i:06d}'
+
+
+def generate(config: DatasetConfig) -> Dataset:
+    rnd = random.Random(config.seed)
+    users = [username(i) for i in range(config.users)]
+    rules, weights = zip(*config.rule_weights.items())
+
+    events = []
+    for author in users:
+        for _ in range(config.events_per_user):
+            # Working hours on a 15 minute grid
+            day = rnd.randrange(config.span.days)
+            start_time = config.start + datetime.timedelta(
+                days=day, hours=rnd.randrange(8, 19), minutes=15 * rnd.randrange(4))
+            end_time = start_time + rnd.choice(DURATIONS)
+
+            participants = rnd.sample(
+                users, min(rnd.randint(0, config.max_participants), len(users)))
+            event = calendar_pb2.Event(
+                user=author,
+                description='bench',
+                repitition_rule=rnd.choices(rules, weights)[0],
+                participants=[user for user in participants if user != author],
+            )
+            event.start_time.FromDatetime(start_time)
+            event.end_time.FromDatetime(end_time)
+            events.append(event)
+    return Dataset(config=config, users=users, events=events)
@@ -0,0 +1,168 @@
+import abc
+import argparse
+import datetime
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import typing as tp
+
+import numpy as np
+from starlette.testclient import TestClient
+
+from bench import dataset
+from proto import calendar_pb2
+from src.main import app
+
+
+LOAD_BATCH_SIZE = 1000
+
+
+class Workload(abc.ABC):
+    name: str
+
+    def __init__(self, data: dataset.Dataset, rnd: random.Random):
+        self.data = data
+        self.rnd = rnd
+
+    def random_time(self) -> datetime.datetime:
+        config = self.data.config
+        return config.start + datetime.timedelta(days=self.rnd.randrange(config.span.days), hours=self.rnd.randrange(24))
+
+    @abc.abstractmethod
+    def __call__(self, client: TestClient):
+        ...
+
+
+class ListEventsWeek(Workload):
+    name = 'list_events_week'
+    window = datetime.timedelta(weeks=1)
+
+    def __call__(self, client: TestClient):
+        since = self.random_time()
+        return client.get('/list_events', params={'user': self.rnd.choice(self.data.users), 'since': since, 'till': since + self.window})
+
+
+class ListEventsYear(ListEventsWeek):
+    name = 'list_events_year'
+    window = datetime.timedelta(days=365)
+
+
+class FindTheGap(Workload):
+    name = 'find_the_gap'
+    group_size = 5
+
+    def __call__(self, client: TestClient):
+        req = calendar_pb2.FindTheGapRequest()
+        req.users.extend(self.rnd.sample(self.data.users, min(
+            self.group_size, len(self.data.users))))
+        req.since.FromDatetime(self.random_time())
+        req.interval.FromTimedelta(datetime.timedelta(minutes=30))
+        return client.post('/find_the_gap', content=req.SerializeToString())
+
+
+class CreateEvent(Workload):
+    name = 'create_event'
+
+    def __call__(self, client: TestClient):
+        start_time = self.random_time()
+        req = calendar_pb2.Event(user=self.rnd.choice(self.data.users), description='bench',
+                                 repitition_rule=calendar_pb2.RepititionRule.NONE)
+        req.start_time.FromDatetime(start_time)
+        req.end_time.FromDatetime(start_time + datetime.timedelta(minutes=30))
+        return client.post('/create_event', content=req.SerializeToString())
+
+
+WORKLOADS = [ListEventsWeek, ListEventsYear, FindTheGap, CreateEvent]
+
+
+def load(client: TestClient, data: dataset.Dataset):
+    for i in range(0, len(data.users), LOAD_BATCH_SIZE):
+        req = calendar_pb2.CreateUsersRequest(
+            usernames=data.users[i:i + LOAD_BATCH_SIZE])
+        client.post('/create_users',
+                    content=req.SerializeToString()).raise_for_status()
+    for i in range(0, len(data.events), LOAD_BATCH_SIZE):
+        req = calendar_pb2.CreateEventsRequest()
+        req.events.extend(data.events[i:i + LOAD_BATCH_SIZE])
+        client.post('/create_events',
+                    content=req.SerializeToString()).raise_for_status()
+
+
+def measure(client: TestClient, workload: Workload, requests: int) -> tp.Dict[str, tp.Any]:
+    latencies = []
+    statuses: tp.Dict[int, int] = {}
+    started = time.perf_counter()
+    for _ in range(requests):
+        request_started = time.perf_counter()
+        resp = workload(client)
+        latencies.append(time.perf_counter() - request_started)
+        statuses[resp.status_code] = statuses.get(resp.status_code, 0) + 1
+    elapsed = time.perf_counter() - started
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+    return dict(
+        endpoint=workload.name,
+        requests=requests,
+        throughput_rps=requests / elapsed,
+        p50_ms=p50,
+        p95_ms=p95,
+        p99_ms=p99,
+        statuses={str(status): count for status, count in statuses.items()},
+    )
+
+
+def git_commit() -> tp.Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes: tp.List[int], events_per_user: int, requests: int, seed: int) -> tp.Dict[str, tp.Any]:
+    # Every dataset is loaded into an empty database
+    os.environ['DATABASE_SCHEMA_MODE'] = 'recreate'
+
+    results = []
+    for size in sizes:
+        data = dataset.generate(dataset.DatasetConfig(
+            users=size, events_per_user=events_per_user, seed=seed))
+        with TestClient(app) as client:
+            started = time.perf_counter()
+            load(client, data)
+            load_time = time.perf_counter() - started
+            for workload in WORKLOADS:
+                result = measure(client, workload(
+                    data, random.Random(seed)), requests)
+                result.update(users=size, events=len(
+                    data.events), load_s=load_time)
+                results.append(result)
+                print(f'{size} users, {result["endpoint"]}: {result["throughput_rps"]:.1f} rps, '
+                      f'p50 {result["p50_ms"]:.2f} ms, p99 {result["p99_ms"]:.2f} ms', file=sys.stderr)
+    return dict(commit=git_commit(), seed=seed, events_per_user=events_per_user, results=results)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Runs the endpoints in-process against DATABASE_URL on synthetic datasets')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000],
+                        help='amounts of users in the generated datasets')
+    parser.add_argument('--events-per-user', type=int, default=20)
+    parser.add_argument('--requests', type=int, default=200,
+                        help='requests per endpoint and dataset')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='file for the JSON report, stdout by default')
+    args = parser.parse_args()
+
+    report = run(args.sizes, args.events_per_user, args.requests, args.seed)
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -22,7 +22,7 @@ DESCRIPTOR = _descriptor.FileDescriptor(
   package='',
   syntax='proto3',
   serialized_options=None,
-  serialized_pb=_b('\n\x14proto/calendar.proto\x1a\x1fgoogle/protobuf/timestamp.proto\x1a\x1egoogle/protobuf/duration.proto\"\x18\n\x04User\x12\x10\n\x08username\x18\x01 \x01(\t\"\xc8\x01\n\x05\x45vent\x12\x0c\n\x04user\x18\x01 \x01(\t\x12\x13\n\x0b\x64\x65scription\x18\n \x01(\t\x12.\n\nstart_time\x18\x14 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12,\n\x08\x65nd_time\x18\x1e \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12(\n\x0frepitition_rule\x18( \x01(\x0e\x32\x0f.RepititionRule\x12\x14\n\x0cparticipants\x18\x32 \x03(\t\"(\n\x0eListEventsResp\x12\x16\n\x06\x65vents\x18\x01 \x03(\x0b\x32\x06.Event\"z\n\x11\x46indTheGapRequest\x12\r\n\x05users\x18\x01 \x03(\t\x12)\n\x05since\x18\n \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12+\n\x08interval\x18\x14 \x01(\x0b\x32\x19.google.protobuf.Duration\"r\n\x12\x46indTheGapResponse\x12.\n\nstart_time\x18\x01 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12,\n\x08\x65nd_time\x18\n \x01(\x0b\x32\x1a.google.protobuf.Timestamp*J\n\x0eRepititionRule\x12\x08\n\x04NONE\x10\x00\x12\t\n\x05\x44\x41ILY\x10\x01\x12\n\n\x06WEEKLY\x10\x02\x12\x0b\n\x07MONTHLY\x10\x03\x12\n\n\x06YEARLY\x10\x04\x62\x06proto3')
+  serialized_pb=_b('\n\x14proto/calendar.proto\x1a\x1fgoogle/protobuf/timestamp.proto\x1a\x1egoogle/protobuf/duration.proto\"\x18\n\x04User\x12\x10\n\x08username\x18\x01 \x01(\t\"\'\n\x12\x43reateUsersRequest\x12\x11\n\tusernames\x18\x01 \x03(\t\"8\n\x13\x43reateUsersResponse\x12\x0f\n\x07\x63reated\x18\x01 \x03(\t\x12\x10\n\x08\x65xisting\x18\n \x03(\t\"\xe8\x02\n\x05\x45vent\x12\x0c\n\x04user\x18\x01 \x01(\t\x12\x13\n\x0b\x64\x65scription\x18\n \x01(\t\x12.\n\nstart_time\x18\x14 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12,\n\x08\x65nd_time\x18\x1e \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12(\n\x0frepitition_rule\x18( \x01(\x0e\x32\x0f.RepititionRule\x12\x14\n\x0cparticipants\x18\x32 \x03(\t\x12\n\n\x02id\x18< \x01(\t\x12\x1b\n\x13repitition_interval\x18\x46 \x01(\r\x12\x18\n\x10repitition_count\x18P \x01(\r\x12\x34\n\x10repitition_until\x18Z \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12%\n\x13repitition_weekdays\x18\x64 \x03(\x0e\x32\x08.Weekday\"-\n\x13\x43reateEventsRequest\x12\x16\n\x06\x65vents\x18\x01 \x03(\x0b\x32\x06.Event\".\n\x11\x43reateEventResult\x12\n\n\x02ok\x18\x01 \x01(\x08\x12\r\n\x05\x65rror\x18\n \x01(\t\";\n\x14\x43reateEventsResponse\x12#\n\x07results\x18\x01 \x03(\x0b\x32\x12.CreateEventResult\"=\n\x0eListEventsResp\x12\x16\n\x06\x65vents\x18\x01 \x03(\x0b\x32\x06.Event\x12\x13\n\x0bnext_cursor\x18\n \x01(\t\"\xc7\x01\n\x11\x43ompactEventsResp\x12\r\n\x05users\x18\x01 \x03(\t\x12\x1e\n\x06series\x18\n \x03(\x0b\x32\x0e.CompactSeries\x12)\n\x05since\x18\x14 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12\x19\n\x11occurrence_series\x18\x1e \x03(\r\x12\x15\n\rstart_offsets\x18( \x03(\x12\x12\x11\n\tdurations\x18\x32 \x03(\x12\x12\x13\n\x0bnext_cursor\x18< \x01(\t\"3\n\rCompactSeries\x12\x0c\n\x04user\x18\x01 \x01(\r\x12\x14\n\x0cparticipants\x18\n \x03(\r\"|\n\x16ListEventsBatchRequest\x12\r\n\x05users\x18\x01 \x03(\t\x12)\n\x05since\x18\n \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12(\n\x04till\x18\x14 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\"*\n\nUserEvents\x12\x0c\n\x04user\x18\x01 \x01(\t\x12\x0e\n\x06\x65vents\x18\n \x03(\r\"I\n\x13ListEventsBatchResp\x12\x16\n\x06\x65vents\x18\x01 \x03(\x0b\x32\x06.Event\x12\x1a\n\x05users\x18\n \x03(\x0b\x32\x0b.UserEvents\"X\n\x16\x43ompactEventsBatchResp\x12\"\n\x06\x65vents\x18\x01 \x01(\x0b\x32\x12.CompactEventsResp\x12\x1a\n\x05users\x18\n \x03(\x0b\x32\x0b.UserEvents\"<\n\x0eSyncEventsResp\x12\x16\n\x06\x65vents\x18\x01 \x03(\x0b\x32\x06.Event\x12\x12\n\nsync_token\x18\n \x01(\t\"z\n\x11\x46indTheGapRequest\x12\r\n\x05users\x18\x01 \x03(\t\x12)\n\x05since\x18\n \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12+\n\x08interval\x18\x14 \x01(\x0b\x32\x19.google.protobuf.Duration\"r\n\x12\x46indTheGapResponse\x12.\n\nstart_time\x18\x01 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12,\n\x08\x65nd_time\x18\n \x01(\x0b\x32\x1a.google.protobuf.Timestamp*J\n\x0eRepititionRule\x12\x08\n\x04NONE\x10\x00\x12\t\n\x05\x44\x41ILY\x10\x01\x12\n\n\x06WEEKLY\x10\x02\x12\x0b\n\x07MONTHLY\x10\x03\x12\n\n\x06YEARLY\x10\x04*e\n\x07Weekday\x12\n\n\x06MONDAY\x10\x00\x12\x0b\n\x07TUESDAY\x10\x01\x12\r\n\tWEDNESDAY\x10\x02\x12\x0c\n\x08THURSDAY\x10\x03\x12\n\n\x06\x46RIDAY\x10\x04\x12\x0c\n\x08SATURDAY\x10\x05\x12\n\n\x06SUNDAY\x10\x06\x62\x06proto3')
   ,
   dependencies=[google_dot_protobuf_dot_timestamp__pb2.DESCRIPTOR,google_dot_protobuf_dot_duration__pb2.DESCRIPTOR,])
 
@@ -55,17 +55,67 @@ _REPITITIONRULE = _descriptor.EnumDescriptor(
   ],
   containing_type=None,
   serialized_options=None,
-  serialized_start=600,
-  serialized_end=674,
+  serialized_start=1688,
+  serialized_end=1762,
 )
 _sym_db.RegisterEnumDescriptor(_REPITITIONRULE)
 
 RepititionRule = enum_type_wrapper.EnumTypeWrapper(_REPITITIONRULE)
+_WEEKDAY = _descriptor.EnumDescriptor(
+  name='Weekday',
+  full_name='Weekday',
+  filename=None,
+  file=DESCRIPTOR,
+  values=[
+    _descriptor.EnumValueDescriptor(
+      name='MONDAY', index=0, number=0,
+      serialized_options=None,
+      type=None),
+    _descriptor.EnumValueDescriptor(
+      name='TUESDAY', index=1, number=1,
+      serialized_options=None,
+      type=None),
+    _descriptor.EnumValueDescriptor(
+      name='WEDNESDAY', index=2, number=2,
+      serialized_options=None,
+      type=None),
+    _descriptor.EnumValueDescriptor(
+      name='THURSDAY', index=3, number=3,
+      serialized_options=None,
+      type=None),
+    _descriptor.EnumValueDescriptor(
+      name='FRIDAY', index=4, number=4,
+      serialized_options=None,
+      type=None),
+    _descriptor.EnumValueDescriptor(
+      name='SATURDAY', index=5, number=5,
+      serialized_options=None,
+      type=None),
+    _descriptor.EnumValueDescriptor(
+      name='SUNDAY', index=6, number=6,
+      serialized_options=None,
+      type=None),
+  ],
+  containing_type=None,
+  serialized_options=None,
+  serialized_start=1764,
+  serialized_end=1865,
+)
+_sym_db.RegisterEnumDescriptor(_WEEKDAY)
+
+Weekday = enum_type_wrapper.EnumTypeWrapper(_WEEKDAY)
 NONE = 0
 DAILY = 1
 WEEKLY = 2
 MONTHLY = 3
 YEARLY = 4
+MONDAY = 0
+TUESDAY = 1
+WEDNESDAY = 2
+THURSDAY = 3
+FRIDAY = 4
+SATURDAY = 5
+SUNDAY = 6
 
 
 
@@ -100,6 +150,75 @@ _USER = _descriptor.Descriptor(
 )
 
 
+_CREATEUSERSREQUEST = _descriptor.Descriptor(
+  name='CreateUsersRequest',
+  full_name='CreateUsersRequest',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='usernames', full_name='CreateUsersRequest.usernames', index=0,
+      number=1, type=9, cpp_type=9, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=115,
+  serialized_end=154,
+)
+
+
+_CREATEUSERSRESPONSE = _descriptor.Descriptor(
+  name='CreateUsersResponse',
+  full_name='CreateUsersResponse',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='created', full_name='CreateUsersResponse.created', index=0,
+      number=1, type=9, cpp_type=9, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='existing', full_name='CreateUsersResponse.existing', index=1,
+      number=10, type=9, cpp_type=9, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=156,
+  serialized_end=212,
+)
+
+
 _EVENT = _descriptor.Descriptor(
   name='Event',
   full_name='Event',
@@ -149,6 +268,41 @@ _EVENT = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='id', full_name='Event.id', index=6,
+      number=60, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='repitition_interval', full_name='Event.repitition_interval', index=7,
+      number=70, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='repitition_count', full_name='Event.repitition_count', index=8,
+      number=80, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='repitition_until', full_name='Event.repitition_until', index=9,
+      number=90, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='repitition_weekdays', full_name='Event.repitition_weekdays', index=10,
+      number=100, type=14, cpp_type=8, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
   ],
   extensions=[
   ],
@@ -161,8 +315,108 @@ _EVENT = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=116,
-  serialized_end=316,
+  serialized_start=215,
+  serialized_end=575,
+)
+
+
+_CREATEEVENTSREQUEST = _descriptor.Descriptor(
+  name='CreateEventsRequest',
+  full_name='CreateEventsRequest',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='events', full_name='CreateEventsRequest.events', index=0,
+      number=1, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=577,
+  serialized_end=622,
+)
+
+
+_CREATEEVENTRESULT = _descriptor.Descriptor(
+  name='CreateEventResult',
+  full_name='CreateEventResult',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='ok', full_name='CreateEventResult.ok', index=0,
+      number=1, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='error', full_name='CreateEventResult.error', index=1,
+      number=10, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=624,
+  serialized_end=670,
+)
+
+
+_CREATEEVENTSRESPONSE = _descriptor.Descriptor(
+  name='CreateEventsResponse',
+  full_name='CreateEventsResponse',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='results', full_name='CreateEventsResponse.results', index=0,
+      number=1, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=672,
+  serialized_end=731,
 )
 
 
@@ -180,6 +434,13 @@ _LISTEVENTSRESP = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='next_cursor', full_name='ListEventsResp.next_cursor', index=1,
+      number=10, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
   ],
   extensions=[
   ],
@@ -192,8 +453,316 @@ _LISTEVENTSRESP = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=318,
-  serialized_end=358,
+  serialized_start=733,
+  serialized_end=794,
+)
+
+
+_COMPACTEVENTSRESP = _descriptor.Descriptor(
+  name='CompactEventsResp',
+  full_name='CompactEventsResp',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='users', full_name='CompactEventsResp.users', index=0,
+      number=1, type=9, cpp_type=9, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='series', full_name='CompactEventsResp.series', index=1,
+      number=10, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='since', full_name='CompactEventsResp.since', index=2,
+      number=20, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='occurrence_series', full_name='CompactEventsResp.occurrence_series', index=3,
+      number=30, type=13, cpp_type=3, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='start_offsets', full_name='CompactEventsResp.start_offsets', index=4,
+      number=40, type=18, cpp_type=2, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='durations', full_name='CompactEventsResp.durations', index=5,
+      number=50, type=18, cpp_type=2, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='next_cursor', full_name='CompactEventsResp.next_cursor', index=6,
+      number=60, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=797,
+  serialized_end=996,
+)
+
+
+_COMPACTSERIES = _descriptor.Descriptor(
+  name='CompactSeries',
+  full_name='CompactSeries',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='user', full_name='CompactSeries.user', index=0,
+      number=1, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='participants', full_name='CompactSeries.participants', index=1,
+      number=10, type=13, cpp_type=3, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=998,
+  serialized_end=1049,
+)
+
+
+_LISTEVENTSBATCHREQUEST = _descriptor.Descriptor(
+  name='ListEventsBatchRequest',
+  full_name='ListEventsBatchRequest',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='users', full_name='ListEventsBatchRequest.users', index=0,
+      number=1, type=9, cpp_type=9, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='since', full_name='ListEventsBatchRequest.since', index=1,
+      number=10, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='till', full_name='ListEventsBatchRequest.till', index=2,
+      number=20, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1051,
+  serialized_end=1175,
+)
+
+
+_USEREVENTS = _descriptor.Descriptor(
+  name='UserEvents',
+  full_name='UserEvents',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='user', full_name='UserEvents.user', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='events', full_name='UserEvents.events', index=1,
+      number=10, type=13, cpp_type=3, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1177,
+  serialized_end=1219,
+)
+
+
+_LISTEVENTSBATCHRESP = _descriptor.Descriptor(
+  name='ListEventsBatchResp',
+  full_name='ListEventsBatchResp',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='events', full_name='ListEventsBatchResp.events', index=0,
+      number=1, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='users', full_name='ListEventsBatchResp.users', index=1,
+      number=10, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1221,
+  serialized_end=1294,
+)
+
+
+_COMPACTEVENTSBATCHRESP = _descriptor.Descriptor(
+  name='CompactEventsBatchResp',
+  full_name='CompactEventsBatchResp',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='events', full_name='CompactEventsBatchResp.events', index=0,
+      number=1, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='users', full_name='CompactEventsBatchResp.users', index=1,
+      number=10, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1296,
+  serialized_end=1384,
+)
+
+
+_SYNCEVENTSRESP = _descriptor.Descriptor(
+  name='SyncEventsResp',
+  full_name='SyncEventsResp',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='events', full_name='SyncEventsResp.events', index=0,
+      number=1, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='sync_token', full_name='SyncEventsResp.sync_token', index=1,
+      number=10, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1386,
+  serialized_end=1446,
 )
 
 
@@ -237,8 +806,8 @@ _FINDTHEGAPREQUEST = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=360,
-  serialized_end=482,
+  serialized_start=1448,
+  serialized_end=1570,
 )
 
 
@@ -275,24 +844,50 @@ _FINDTHEGAPRESPONSE = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=484,
-  serialized_end=598,
+  serialized_start=1572,
+  serialized_end=1686,
 )
 
 _EVENT.fields_by_name['start_time'].message_type = google_dot_protobuf_dot_timestamp__pb2._TIMESTAMP
 _EVENT.fields_by_name['end_time'].message_type = google_dot_protobuf_dot_timestamp__pb2._TIMESTAMP
 _EVENT.fields_by_name['repitition_rule'].enum_type = _REPITITIONRULE
+_EVENT.fields_by_name['repitition_until'].message_type = google_dot_protobuf_dot_timestamp__pb2._TIMESTAMP
+_EVENT.fields_by_name['repitition_weekdays'].enum_type = _WEEKDAY
+_CREATEEVENTSREQUEST.fields_by_name['events'].message_type = _EVENT
+_CREATEEVENTSRESPONSE.fields_by_name['results'].message_type = _CREATEEVENTRESULT
 _LISTEVENTSRESP.fields_by_name['events'].message_type = _EVENT
+_COMPACTEVENTSRESP.fields_by_name['series'].message_type = _COMPACTSERIES
+_COMPACTEVENTSRESP.fields_by_name['since'].message_type = google_dot_protobuf_dot_timestamp__pb2._TIMESTAMP
+_LISTEVENTSBATCHREQUEST.fields_by_name['since'].message_type = google_dot_protobuf_dot_timestamp__pb2._TIMESTAMP
+_LISTEVENTSBATCHREQUEST.fields_by_name['till'].message_type = google_dot_protobuf_dot_timestamp__pb2._TIMESTAMP
+_LISTEVENTSBATCHRESP.fields_by_name['events'].message_type = _EVENT
+_LISTEVENTSBATCHRESP.fields_by_name['users'].message_type = _USEREVENTS
+_COMPACTEVENTSBATCHRESP.fields_by_name['events'].message_type = _COMPACTEVENTSRESP
+_COMPACTEVENTSBATCHRESP.fields_by_name['users'].message_type = _USEREVENTS
+_SYNCEVENTSRESP.fields_by_name['events'].message_type = _EVENT
 _FINDTHEGAPREQUEST.fields_by_name['since'].message_type = google_dot_protobuf_dot_timestamp__pb2._TIMESTAMP
 _FINDTHEGAPREQUEST.fields_by_name['interval'].message_type = google_dot_protobuf_dot_duration__pb2._DURATION
 _FINDTHEGAPRESPONSE.fields_by_name['start_time'].message_type = google_dot_protobuf_dot_timestamp__pb2._TIMESTAMP
 _FINDTHEGAPRESPONSE.fields_by_name['end_time'].message_type = google_dot_protobuf_dot_timestamp__pb2._TIMESTAMP
 DESCRIPTOR.message_types_by_name['User'] = _USER
+DESCRIPTOR.message_types_by_name['CreateUsersRequest'] = _CREATEUSERSREQUEST
+DESCRIPTOR.message_types_by_name['CreateUsersResponse'] = _CREATEUSERSRESPONSE
 DESCRIPTOR.message_types_by_name['Event'] = _EVENT
+DESCRIPTOR.message_types_by_name['CreateEventsRequest'] = _CREATEEVENTSREQUEST
+DESCRIPTOR.message_types_by_name['CreateEventResult'] = _CREATEEVENTRESULT
+DESCRIPTOR.message_types_by_name['CreateEventsResponse'] = _CREATEEVENTSRESPONSE
 DESCRIPTOR.message_types_by_name['ListEventsResp'] = _LISTEVENTSRESP
+DESCRIPTOR.message_types_by_name['CompactEventsResp'] = _COMPACTEVENTSRESP
+DESCRIPTOR.message_types_by_name['CompactSeries'] = _COMPACTSERIES
+DESCRIPTOR.message_types_by_name['ListEventsBatchRequest'] = _LISTEVENTSBATCHREQUEST
+DESCRIPTOR.message_types_by_name['UserEvents'] = _USEREVENTS
+DESCRIPTOR.message_types_by_name['ListEventsBatchResp'] = _LISTEVENTSBATCHRESP
+DESCRIPTOR.message_types_by_name['CompactEventsBatchResp'] = _COMPACTEVENTSBATCHRESP
+DESCRIPTOR.message_types_by_name['SyncEventsResp'] = _SYNCEVENTSRESP
 DESCRIPTOR.message_types_by_name['FindTheGapRequest'] = _FINDTHEGAPREQUEST
 DESCRIPTOR.message_types_by_name['FindTheGapResponse'] = _FINDTHEGAPRESPONSE
 DESCRIPTOR.enum_types_by_name['RepititionRule'] = _REPITITIONRULE
+DESCRIPTOR.enum_types_by_name['Weekday'] = _WEEKDAY
 _sym_db.RegisterFileDescriptor(DESCRIPTOR)
 
 User = _reflection.GeneratedProtocolMessageType('User', (_message.Message,), dict(
@@ -302,6 +897,20 @@ User = _reflection.GeneratedProtocolMessageType('User', (_message.Message,), dic
   ))
 _sym_db.RegisterMessage(User)
 
+CreateUsersRequest = _reflection.GeneratedProtocolMessageType('CreateUsersRequest', (_message.Message,), dict(
+  DESCRIPTOR = _CREATEUSERSREQUEST,
+  __module__ = 'proto.calendar_pb2'
+  # @@protoc_insertion_point(class_scope:CreateUsersRequest)
+  ))
+_sym_db.RegisterMessage(CreateUsersRequest)
+
+CreateUsersResponse = _reflection.GeneratedProtocolMessageType('CreateUsersResponse', (_message.Message,), dict(
+  DESCRIPTOR = _CREATEUSERSRESPONSE,
+  __module__ = 'proto.calendar_pb2'
+  # @@protoc_insertion_point(class_scope:CreateUsersResponse)
+  ))
+_sym_db.RegisterMessage(CreateUsersResponse)
+
 Event = _reflection.GeneratedProtocolMessageType('Event', (_message.Message,), dict(
   DESCRIPTOR = _EVENT,
   __module__ = 'proto.calendar_pb2'
@@ -309,6 +918,27 @@ Event = _reflection.GeneratedProtocolMessageType('Event', (_message.Message,), d
   ))
 _sym_db.RegisterMessage(Event)
 
+CreateEventsRequest = _reflection.GeneratedProtocolMessageType('CreateEventsRequest', (_message.Message,), dict(
+  DESCRIPTOR = _CREATEEVENTSREQUEST,
+  __module__ = 'proto.calendar_pb2'
+  # @@protoc_insertion_point(class_scope:CreateEventsRequest)
+  ))
+_sym_db.RegisterMessage(CreateEventsRequest)
+
+CreateEventResult = _reflection.GeneratedProtocolMessageType('CreateEventResult', (_message.Message,), dict(
+  DESCRIPTOR = _CREATEEVENTRESULT,
+  __module__ = 'proto.calendar_pb2'
+  # @@protoc_insertion_point(class_scope:CreateEventResult)
+  ))
+_sym_db.RegisterMessage(CreateEventResult)
+
+CreateEventsResponse = _reflection.GeneratedProtocolMessageType('CreateEventsResponse', (_message.Message,), dict(
+  DESCRIPTOR = _CREATEEVENTSRESPONSE,
+  __module__ = 'proto.calendar_pb2'
+  # @@protoc_insertion_point(class_scope:CreateEventsResponse)
+  ))
+_sym_db.RegisterMessage(CreateEventsResponse)
+
 ListEventsResp = _reflection.GeneratedProtocolMessageType('ListEventsResp', (_message.Message,), dict(
   DESCRIPTOR = _LISTEVENTSRESP,
   __module__ = 'proto.calendar_pb2'
@@ -316,6 +946,55 @@ ListEventsResp = _reflection.GeneratedProtocolMessageType('ListEventsResp', (_me
   ))
 _sym_db.RegisterMessage(ListEventsResp)
 
+CompactEventsResp = _reflection.GeneratedProtocolMessageType('CompactEventsResp', (_message.Message,), dict(
+  DESCRIPTOR = _COMPACTEVENTSRESP,
+  __module__ = 'proto.calendar_pb2'
+  # @@protoc_insertion_point(class_scope:CompactEventsResp)
+  ))
+_sym_db.RegisterMessage(CompactEventsResp)
+
+CompactSeries = _reflection.GeneratedProtocolMessageType('CompactSeries', (_message.Message,), dict(
+  DESCRIPTOR = _COMPACTSERIES,
+  __module__ = 'proto.calendar_pb2'
+  # @@protoc_insertion_point(class_scope:CompactSeries)
+  ))
+_sym_db.RegisterMessage(CompactSeries)
+
+ListEventsBatchRequest = _reflection.GeneratedProtocolMessageType('ListEventsBatchRequest', (_message.Message,), dict(
+  DESCRIPTOR = _LISTEVENTSBATCHREQUEST,
+  __module__ = 'proto.calendar_pb2'
+  # @@protoc_insertion_point(class_scope:ListEventsBatchRequest)
+  ))
+_sym_db.RegisterMessage(ListEventsBatchRequest)
+
+UserEvents = _reflection.GeneratedProtocolMessageType('UserEvents', (_message.Message,), dict(
+  DESCRIPTOR = _USEREVENTS,
+  __module__ = 'proto.calendar_pb2'
+  # @@protoc_insertion_point(class_scope:UserEvents)
+  ))
+_sym_db.RegisterMessage(UserEvents)
+
+ListEventsBatchResp = _reflection.GeneratedProtocolMessageType('ListEventsBatchResp', (_message.Message,), dict(
+  DESCRIPTOR = _LISTEVENTSBATCHRESP,
+  __module__ = 'proto.calendar_pb2'
+  # @@protoc_insertion_point(class_scope:ListEventsBatchResp)
+  ))
+_sym_db.RegisterMessage(ListEventsBatchResp)
+
+CompactEventsBatchResp = _reflection.GeneratedProtocolMessageType('CompactEventsBatchResp', (_message.Message,), dict(
+  DESCRIPTOR = _COMPACTEVENTSBATCHRESP,
+  __module__ = 'proto.calendar_pb2'
+  # @@protoc_insertion_point(class_scope:CompactEventsBatchResp)
+  ))
+_sym_db.RegisterMessage(CompactEventsBatchResp)
+
+SyncEventsResp = _reflection.GeneratedProtocolMessageType('SyncEventsResp', (_message.Message,), dict(
+  DESCRIPTOR = _SYNCEVENTSRESP,
+  __module__ = 'proto.calendar_pb2'
+  # @@protoc_insertion_point(class_scope:SyncEventsResp)
+  ))
+_sym_db.RegisterMessage(SyncEventsResp)
+
 FindTheGapRequest = _reflection.GeneratedProtocolMessageType('FindTheGapRequest', (_message.Message,), dict(
   DESCRIPTOR = _FINDTHEGAPREQUEST,
   __module__ = 'proto.calendar_pb2'
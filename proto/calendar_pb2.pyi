@@ -41,6 +41,31 @@ MONTHLY: RepititionRule.ValueType  # 3
 YEARLY: RepititionRule.ValueType  # 4
 global___RepititionRule = RepititionRule
 
+class _Weekday:
+    ValueType = typing.NewType("ValueType", builtins.int)
+    V: typing_extensions.TypeAlias = ValueType
+
+class _WeekdayEnumTypeWrapper(google.protobuf.internal.enum_type_wrapper._EnumTypeWrapper[_Weekday.ValueType], builtins.type):
+    DESCRIPTOR: google.protobuf.descriptor.EnumDescriptor
+    MONDAY: _Weekday.ValueType  # 0
+    TUESDAY: _Weekday.ValueType  # 1
+    WEDNESDAY: _Weekday.ValueType  # 2
+    THURSDAY: _Weekday.ValueType  # 3
+    FRIDAY: _Weekday.ValueType  # 4
+    SATURDAY: _Weekday.ValueType  # 5
+    SUNDAY: _Weekday.ValueType  # 6
+
+class Weekday(_Weekday, metaclass=_WeekdayEnumTypeWrapper): ...
+
+MONDAY: Weekday.ValueType  # 0
+TUESDAY: Weekday.ValueType  # 1
+WEDNESDAY: Weekday.ValueType  # 2
+THURSDAY: Weekday.ValueType  # 3
+FRIDAY: Weekday.ValueType  # 4
+SATURDAY: Weekday.ValueType  # 5
+SUNDAY: Weekday.ValueType  # 6
+global___Weekday = Weekday
+
 @typing_extensions.final
 class User(google.protobuf.message.Message):
     DESCRIPTOR: google.protobuf.descriptor.Descriptor
@@ -56,6 +81,42 @@ class User(google.protobuf.message.Message):
 
 global___User = User
 
+@typing_extensions.final
+class CreateUsersRequest(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+
+    USERNAMES_FIELD_NUMBER: builtins.int
+    @property
+    def usernames(self) -> google.protobuf.internal.containers.RepeatedScalarFieldContainer[builtins.str]: ...
+    def __init__(
+        self,
+        *,
+        usernames: collections.abc.Iterable[builtins.str] | None = ...,
+    ) -> None: ...
+    def ClearField(self, field_name: typing_extensions.Literal["usernames", b"usernames"]) -> None: ...
+
+global___CreateUsersRequest = CreateUsersRequest
+
+@typing_extensions.final
+class CreateUsersResponse(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+
+    CREATED_FIELD_NUMBER: builtins.int
+    EXISTING_FIELD_NUMBER: builtins.int
+    @property
+    def created(self) -> google.protobuf.internal.containers.RepeatedScalarFieldContainer[builtins.str]: ...
+    @property
+    def existing(self) -> google.protobuf.internal.containers.RepeatedScalarFieldContainer[builtins.str]: ...
+    def __init__(
+        self,
+        *,
+        created: collections.abc.Iterable[builtins.str] | None = ...,
+        existing: collections.abc.Iterable[builtins.str] | None = ...,
+    ) -> None: ...
+    def ClearField(self, field_name: typing_extensions.Literal["created", b"created", "existing", b"existing"]) -> None: ...
+
+global___CreateUsersResponse = CreateUsersResponse
+
 @typing_extensions.final
 class Event(google.protobuf.message.Message):
     DESCRIPTOR: google.protobuf.descriptor.Descriptor
@@ -66,6 +127,11 @@ class Event(google.protobuf.message.Message):
     END_TIME_FIELD_NUMBER: builtins.int
     REPITITION_RULE_FIELD_NUMBER: builtins.int
     PARTICIPANTS_FIELD_NUMBER: builtins.int
+    ID_FIELD_NUMBER: builtins.int
+    REPITITION_INTERVAL_FIELD_NUMBER: builtins.int
+    REPITITION_COUNT_FIELD_NUMBER: builtins.int
+    REPITITION_UNTIL_FIELD_NUMBER: builtins.int
+    REPITITION_WEEKDAYS_FIELD_NUMBER: builtins.int
     user: builtins.str
     description: builtins.str
     @property
@@ -75,6 +141,18 @@ class Event(google.protobuf.message.Message):
     repitition_rule: global___RepititionRule.ValueType
     @property
     def participants(self) -> google.protobuf.internal.containers.RepeatedScalarFieldContainer[builtins.str]: ...
+    id: builtins.str
+    """Set in responses describing whole series, e.g. SyncEventsResp"""
+    repitition_interval: builtins.int
+    """Repeat every n-th day/week/month/year, 0 means 1"""
+    repitition_count: builtins.int
+    """Amount of occurrences, 0 means no limit"""
+    @property
+    def repitition_until(self) -> google.protobuf.timestamp_pb2.Timestamp:
+        """Occurrences start no later than this"""
+    @property
+    def repitition_weekdays(self) -> google.protobuf.internal.containers.RepeatedScalarFieldContainer[global___Weekday.ValueType]:
+        """Days of week a weekly event repeats on, the day of start_time if empty"""
     def __init__(
         self,
         *,
@@ -84,14 +162,19 @@ class Event(google.protobuf.message.Message):
         end_time: google.protobuf.timestamp_pb2.Timestamp | None = ...,
         repitition_rule: global___RepititionRule.ValueType = ...,
         participants: collections.abc.Iterable[builtins.str] | None = ...,
+        id: builtins.str = ...,
+        repitition_interval: builtins.int = ...,
+        repitition_count: builtins.int = ...,
+        repitition_until: google.protobuf.timestamp_pb2.Timestamp | None = ...,
+        repitition_weekdays: collections.abc.Iterable[global___Weekday.ValueType] | None = ...,
     ) -> None: ...
-    def HasField(self, field_name: typing_extensions.Literal["end_time", b"end_time", "start_time", b"start_time"]) -> builtins.bool: ...
-    def ClearField(self, field_name: typing_extensions.Literal["description", b"description", "end_time", b"end_time", "participants", b"participants", "repitition_rule", b"repitition_rule", "start_time", b"start_time", "user", b"user"]) -> None: ...
+    def HasField(self, field_name: typing_extensions.Literal["end_time", b"end_time", "repitition_until", b"repitition_until", "start_time", b"start_time"]) -> builtins.bool: ...
+    def ClearField(self, field_name: typing_extensions.Literal["description", b"description", "end_time", b"end_time", "id", b"id", "participants", b"participants", "repitition_count", b"repitition_count", "repitition_interval", b"repitition_interval", "repitition_rule", b"repitition_rule", "repitition_until", b"repitition_until", "repitition_weekdays", b"repitition_weekdays", "start_time", b"start_time", "user", b"user"]) -> None: ...
 
 global___Event = Event
 
 @typing_extensions.final
-class ListEventsResp(google.protobuf.message.Message):
+class CreateEventsRequest(google.protobuf.message.Message):
     DESCRIPTOR: google.protobuf.descriptor.Descriptor
 
     EVENTS_FIELD_NUMBER: builtins.int
@@ -104,8 +187,240 @@ class ListEventsResp(google.protobuf.message.Message):
     ) -> None: ...
     def ClearField(self, field_name: typing_extensions.Literal["events", b"events"]) -> None: ...
 
+global___CreateEventsRequest = CreateEventsRequest
+
+@typing_extensions.final
+class CreateEventResult(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+
+    OK_FIELD_NUMBER: builtins.int
+    ERROR_FIELD_NUMBER: builtins.int
+    ok: builtins.bool
+    error: builtins.str
+    def __init__(
+        self,
+        *,
+        ok: builtins.bool = ...,
+        error: builtins.str = ...,
+    ) -> None: ...
+    def ClearField(self, field_name: typing_extensions.Literal["error", b"error", "ok", b"ok"]) -> None: ...
+
+global___CreateEventResult = CreateEventResult
+
+@typing_extensions.final
+class CreateEventsResponse(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+
+    RESULTS_FIELD_NUMBER: builtins.int
+    @property
+    def results(self) -> google.protobuf.internal.containers.RepeatedCompositeFieldContainer[global___CreateEventResult]: ...
+    def __init__(
+        self,
+        *,
+        results: collections.abc.Iterable[global___CreateEventResult] | None = ...,
+    ) -> None: ...
+    def ClearField(self, field_name: typing_extensions.Literal["results", b"results"]) -> None: ...
+
+global___CreateEventsResponse = CreateEventsResponse
+
+@typing_extensions.final
+class ListEventsResp(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+
+    EVENTS_FIELD_NUMBER: builtins.int
+    NEXT_CURSOR_FIELD_NUMBER: builtins.int
+    @property
+    def events(self) -> google.protobuf.internal.containers.RepeatedCompositeFieldContainer[global___Event]: ...
+    next_cursor: builtins.str
+    """Set on paginated responses when there are more events, pass as `cursor` for the next page"""
+    def __init__(
+        self,
+        *,
+        events: collections.abc.Iterable[global___Event] | None = ...,
+        next_cursor: builtins.str = ...,
+    ) -> None: ...
+    def ClearField(self, field_name: typing_extensions.Literal["events", b"events", "next_cursor", b"next_cursor"]) -> None: ...
+
 global___ListEventsResp = ListEventsResp
 
+@typing_extensions.final
+class CompactEventsResp(google.protobuf.message.Message):
+    """Same occurrences as ListEventsResp, sent instead of it when the client accepts
+    application/x-protobuf-compact
+    """
+
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+
+    USERS_FIELD_NUMBER: builtins.int
+    SERIES_FIELD_NUMBER: builtins.int
+    SINCE_FIELD_NUMBER: builtins.int
+    OCCURRENCE_SERIES_FIELD_NUMBER: builtins.int
+    START_OFFSETS_FIELD_NUMBER: builtins.int
+    DURATIONS_FIELD_NUMBER: builtins.int
+    NEXT_CURSOR_FIELD_NUMBER: builtins.int
+    @property
+    def users(self) -> google.protobuf.internal.containers.RepeatedScalarFieldContainer[builtins.str]:
+        """Users are referenced by index into this list"""
+    @property
+    def series(self) -> google.protobuf.internal.containers.RepeatedCompositeFieldContainer[global___CompactSeries]: ...
+    @property
+    def since(self) -> google.protobuf.timestamp_pb2.Timestamp: ...
+    @property
+    def occurrence_series(self) -> google.protobuf.internal.containers.RepeatedScalarFieldContainer[builtins.int]:
+        """One element per occurrence in every column"""
+    @property
+    def start_offsets(self) -> google.protobuf.internal.containers.RepeatedScalarFieldContainer[builtins.int]:
+        """Microseconds since `since`"""
+    @property
+    def durations(self) -> google.protobuf.internal.containers.RepeatedScalarFieldContainer[builtins.int]:
+        """Microseconds since the start of the occurrence"""
+    next_cursor: builtins.str
+    def __init__(
+        self,
+        *,
+        users: collections.abc.Iterable[builtins.str] | None = ...,
+        series: collections.abc.Iterable[global___CompactSeries] | None = ...,
+        since: google.protobuf.timestamp_pb2.Timestamp | None = ...,
+        occurrence_series: collections.abc.Iterable[builtins.int] | None = ...,
+        start_offsets: collections.abc.Iterable[builtins.int] | None = ...,
+        durations: collections.abc.Iterable[builtins.int] | None = ...,
+        next_cursor: builtins.str = ...,
+    ) -> None: ...
+    def HasField(self, field_name: typing_extensions.Literal["since", b"since"]) -> builtins.bool: ...
+    def ClearField(self, field_name: typing_extensions.Literal["durations", b"durations", "next_cursor", b"next_cursor", "occurrence_series", b"occurrence_series", "series", b"series", "since", b"since", "start_offsets", b"start_offsets", "users", b"users"]) -> None: ...
+
+global___CompactEventsResp = CompactEventsResp
+
+@typing_extensions.final
+class CompactSeries(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+
+    USER_FIELD_NUMBER: builtins.int
+    PARTICIPANTS_FIELD_NUMBER: builtins.int
+    user: builtins.int
+    @property
+    def participants(self) -> google.protobuf.internal.containers.RepeatedScalarFieldContainer[builtins.int]: ...
+    def __init__(
+        self,
+        *,
+        user: builtins.int = ...,
+        participants: collections.abc.Iterable[builtins.int] | None = ...,
+    ) -> None: ...
+    def ClearField(self, field_name: typing_extensions.Literal["participants", b"participants", "user", b"user"]) -> None: ...
+
+global___CompactSeries = CompactSeries
+
+@typing_extensions.final
+class ListEventsBatchRequest(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+
+    USERS_FIELD_NUMBER: builtins.int
+    SINCE_FIELD_NUMBER: builtins.int
+    TILL_FIELD_NUMBER: builtins.int
+    @property
+    def users(self) -> google.protobuf.internal.containers.RepeatedScalarFieldContainer[builtins.str]: ...
+    @property
+    def since(self) -> google.protobuf.timestamp_pb2.Timestamp: ...
+    @property
+    def till(self) -> google.protobuf.timestamp_pb2.Timestamp: ...
+    def __init__(
+        self,
+        *,
+        users: collections.abc.Iterable[builtins.str] | None = ...,
+        since: google.protobuf.timestamp_pb2.Timestamp | None = ...,
+        till: google.protobuf.timestamp_pb2.Timestamp | None = ...,
+    ) -> None: ...
+    def HasField(self, field_name: typing_extensions.Literal["since", b"since", "till", b"till"]) -> builtins.bool: ...
+    def ClearField(self, field_name: typing_extensions.Literal["since", b"since", "till", b"till", "users", b"users"]) -> None: ...
+
+global___ListEventsBatchRequest = ListEventsBatchRequest
+
+@typing_extensions.final
+class UserEvents(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+
+    USER_FIELD_NUMBER: builtins.int
+    EVENTS_FIELD_NUMBER: builtins.int
+    user: builtins.str
+    @property
+    def events(self) -> google.protobuf.internal.containers.RepeatedScalarFieldContainer[builtins.int]:
+        """Indices into ListEventsBatchResp.events"""
+    def __init__(
+        self,
+        *,
+        user: builtins.str = ...,
+        events: collections.abc.Iterable[builtins.int] | None = ...,
+    ) -> None: ...
+    def ClearField(self, field_name: typing_extensions.Literal["events", b"events", "user", b"user"]) -> None: ...
+
+global___UserEvents = UserEvents
+
+@typing_extensions.final
+class ListEventsBatchResp(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+
+    EVENTS_FIELD_NUMBER: builtins.int
+    USERS_FIELD_NUMBER: builtins.int
+    @property
+    def events(self) -> google.protobuf.internal.containers.RepeatedCompositeFieldContainer[global___Event]:
+        """Every occurrence once, however many of the requested users take part in it"""
+    @property
+    def users(self) -> google.protobuf.internal.containers.RepeatedCompositeFieldContainer[global___UserEvents]: ...
+    def __init__(
+        self,
+        *,
+        events: collections.abc.Iterable[global___Event] | None = ...,
+        users: collections.abc.Iterable[global___UserEvents] | None = ...,
+    ) -> None: ...
+    def ClearField(self, field_name: typing_extensions.Literal["events", b"events", "users", b"users"]) -> None: ...
+
+global___ListEventsBatchResp = ListEventsBatchResp
+
+@typing_extensions.final
+class CompactEventsBatchResp(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+
+    EVENTS_FIELD_NUMBER: builtins.int
+    USERS_FIELD_NUMBER: builtins.int
+    @property
+    def events(self) -> global___CompactEventsResp: ...
+    @property
+    def users(self) -> google.protobuf.internal.containers.RepeatedCompositeFieldContainer[global___UserEvents]:
+        """UserEvents.events index occurrences of `events`"""
+    def __init__(
+        self,
+        *,
+        events: global___CompactEventsResp | None = ...,
+        users: collections.abc.Iterable[global___UserEvents] | None = ...,
+    ) -> None: ...
+    def HasField(self, field_name: typing_extensions.Literal["events", b"events"]) -> builtins.bool: ...
+    def ClearField(self, field_name: typing_extensions.Literal["events", b"events", "users", b"users"]) -> None: ...
+
+global___CompactEventsBatchResp = CompactEventsBatchResp
+
+@typing_extensions.final
+class SyncEventsResp(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+
+    EVENTS_FIELD_NUMBER: builtins.int
+    SYNC_TOKEN_FIELD_NUMBER: builtins.int
+    @property
+    def events(self) -> google.protobuf.internal.containers.RepeatedCompositeFieldContainer[global___Event]:
+        """Series created or changed since the sync token of the request, a series
+        may be repeated in the following syncs
+        """
+    sync_token: builtins.str
+    """Opaque, pass to the next sync"""
+    def __init__(
+        self,
+        *,
+        events: collections.abc.Iterable[global___Event] | None = ...,
+        sync_token: builtins.str = ...,
+    ) -> None: ...
+    def ClearField(self, field_name: typing_extensions.Literal["events", b"events", "sync_token", b"sync_token"]) -> None: ...
+
+global___SyncEventsResp = SyncEventsResp
+
 @typing_extensions.final
 class FindTheGapRequest(google.protobuf.message.Message):
     DESCRIPTOR: google.protobuf.descriptor.Descriptor
@@ -0,0 +1,253 @@
+import collections
+import datetime
+import heapq
+import operator
+import time
+import typing as tp
+
+import numpy as np
+from sqlalchemy import and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src import datamodel, queries, recurrence
+
+
+class LRUCache:
+    def __init__(self, max_size: int, on_evict: tp.Optional[tp.Callable[[tp.Hashable], None]] = None):
+        self.max_size = max_size
+        self.size = 0
+        self.on_evict = on_evict
+        self._items: tp.OrderedDict[tp.Hashable,
+                                    tp.Tuple[tp.Any, int]] = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key: tp.Hashable):
+        return key in self._items
+
+    def get(self, key: tp.Hashable, default=None):
+        item = self._items.get(key)
+        if item is None:
+            return default
+        self._items.move_to_end(key)
+        return item[0]
+
+    def put(self, key: tp.Hashable, value, size: int):
+        self.pop(key)
+        if size > self.max_size:
+            return
+        self._items[key] = (value, size)
+        self.size += size
+        while self.size > self.max_size:
+            evicted, (_, evicted_size) = self._items.popitem(last=False)
+            self.size -= evicted_size
+            self._evicted(evicted)
+
+    def pop(self, key: tp.Hashable):
+        item = self._items.pop(key, None)
+        if item is not None:
+            self.size -= item[1]
+            self._evicted(key)
+
+    def _evicted(self, key: tp.Hashable):
+        if self.on_evict is not None:
+            self.on_evict(key)
+
+
+# Rough memory footprint of one cached occurrence and of an empty bucket
+OCCURRENCE_SIZE = 128
+BUCKET_SIZE = 64
+WEEK = datetime.timedelta(weeks=1)
+WEEK_US = WEEK // recurrence.MICROSECOND
+# 1970-01-05, the first Monday after the epoch
+MONDAY_US = 4 * 24 * 3600 * 10 ** 6
+
+
+class CachedOccurrence(tp.NamedTuple):
+    event_id: tp.Any
+    author: str
+    # Microseconds since the epoch, the same as in handles.Event
+    start_time: int
+    end_time: int
+    participants: tp.Tuple[str, ...]
+
+
+class CachedBucket(tp.NamedTuple):
+    occurrences: tp.List[CachedOccurrence]
+    expires: float
+
+
+def week_bucket(time: int) -> int:
+    return time - (time - MONDAY_US) % WEEK_US
+
+
+class OccurrenceCache:
+    # Expanded occurrences keyed by (user, start of the week in microseconds). Buckets hold
+    # occurrences starting inside the week, following every series from its start.
+    # Writes through this process invalidate them, ttl bounds staleness after writes through others
+    def __init__(self, max_bytes: int, ttl: datetime.timedelta):
+        self.lru = LRUCache(max_bytes, on_evict=self._on_evict)
+        self.ttl = ttl.total_seconds()
+        self.hits = 0
+        self.misses = 0
+        self._weeks_by_user: tp.Dict[str,
+                                     tp.Set[int]] = collections.defaultdict(set)
+        # Bumped on every invalidation, so that a fetch racing with a write isn't cached
+        self._generation = 0
+
+    def _on_evict(self, key: tp.Tuple[str, int]):
+        user, week = key
+        weeks = self._weeks_by_user.get(user)
+        if weeks is not None:
+            weeks.discard(week)
+            if not weeks:
+                del self._weeks_by_user[user]
+
+    def _put(self, user: str, week: int, occurrences: tp.List[CachedOccurrence]):
+        self.lru.put((user, week), CachedBucket(occurrences, time.monotonic() + self.ttl),
+                     BUCKET_SIZE + OCCURRENCE_SIZE * len(occurrences))
+        if (user, week) in self.lru:
+            self._weeks_by_user[user].add(week)
+
+    def invalidate(self, users: tp.Iterable[str]):
+        self._generation += 1
+        for user in set(users):
+            for week in list(self._weeks_by_user.get(user, ())):
+                self.lru.pop((user, week))
+
+    async def list_events(self, users: tp.List[str], db: AsyncSession, time_since: datetime.datetime, time_till: datetime.datetime) -> tp.AsyncGenerator[CachedOccurrence, None]:
+        since, till = recurrence.to_epoch_us(
+            time_since), recurrence.to_epoch_us(time_till)
+        weeks = list(range(week_bucket(since), till, WEEK_US))
+
+        buckets = {}
+        missing = set()
+        now = time.monotonic()
+        for user in users:
+            for week in weeks:
+                bucket = self.lru.get((user, week))
+                if bucket is not None and bucket.expires <= now:
+                    self.lru.pop((user, week))
+                    bucket = None
+                if bucket is None:
+                    self.misses += 1
+                    missing.add((user, week))
+                else:
+                    self.hits += 1
+                    buckets[(user, week)] = bucket.occurrences
+
+        if missing:
+            generation = self._generation
+            fetched = await self._fetch(db, missing)
+            if generation == self._generation:
+                for key in missing:
+                    self._put(*key, fetched[key])
+            buckets.update(fetched)
+
+        seen = set()
+        for week in weeks:
+            # Buckets are sorted by start time, so is the output
+            for occurrence in heapq.merge(*(buckets[(user, week)] for user in users), key=operator.attrgetter('start_time')):
+                if occurrence.start_time < since or occurrence.start_time >= till:
+                    continue
+                if (occurrence.event_id, occurrence.start_time) in seen:
+                    continue
+                seen.add((occurrence.event_id, occurrence.start_time))
+                yield occurrence
+
+    async def _fetch(self, db: AsyncSession, keys: tp.Set[tp.Tuple[str, int]]) -> tp.Dict[tp.Tuple[str, int], tp.List[CachedOccurrence]]:
+        users = {user for user, _ in keys}
+        time_since = recurrence.EPOCH + \
+            min(week for _, week in keys) * recurrence.MICROSECOND
+        time_till = recurrence.EPOCH + \
+            max(week for _, week in keys) * recurrence.MICROSECOND + WEEK
+
+        query = queries.select_series(users).where(
+            and_(
+                queries.active_between(time_since, time_till),
+                or_(
+                    datamodel.Event.repitition_rule != datamodel.RepititionRule.NONE,
+                    datamodel.Event.start_time >= time_since,
+                )
+            )
+        )
+        rows = (await db.execute(query)).all()
+
+        result = {key: [] for key in keys}
+        participants = [tuple(row.participants) for row in rows]
+        occurrences = recurrence.expand_series(rows, time_since, time_till)
+        for series, start_time, end_time in zip(occurrences.series.tolist(), occurrences.start_time.astype(np.int64).tolist(), occurrences.end_time.astype(np.int64).tolist()):
+            occurrence = CachedOccurrence(
+                event_id=rows[series].id,
+                author=rows[series].author,
+                start_time=start_time,
+                end_time=end_time,
+                participants=participants[series],
+            )
+            week = week_bucket(start_time)
+            for user in set(participants[series]):
+                bucket = result.get((user, week))
+                if bucket is not None:
+                    bucket.append(occurrence)
+        for bucket in result.values():
+            bucket.sort(key=operator.attrgetter('start_time'))
+        return result
+
+
+# Rough memory footprint of a cached response besides its content
+RESPONSE_SIZE = 256
+
+
+class CachedResponse(tp.NamedTuple):
+    content: bytes
+    etag: str
+    expires: float
+
+
+class ResponseCache:
+    # Serialized list_events responses keyed by (user, since, till, variant). Writes through
+    # this process invalidate them, ttl bounds staleness after writes through others
+    def __init__(self, max_bytes: int, ttl: datetime.timedelta):
+        self.lru = LRUCache(max_bytes, on_evict=self._on_evict)
+        self.ttl = ttl.total_seconds()
+        self.hits = 0
+        self.misses = 0
+        self._keys_by_user: tp.Dict[str, tp.Set[tp.Tuple[str, datetime.datetime,
+                                                         datetime.datetime, str]]] = collections.defaultdict(set)
+        # Bumped on every invalidation, so that a response racing with a write isn't cached
+        self.generation = 0
+
+    def _on_evict(self, key: tp.Tuple[str, datetime.datetime, datetime.datetime, str]):
+        keys = self._keys_by_user.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[key[0]]
+
+    def get(self, user: str, time_since: datetime.datetime, time_till: datetime.datetime, variant: str = '') -> tp.Optional[CachedResponse]:
+        key = (user, time_since, time_till, variant)
+        response = self.lru.get(key)
+        if response is not None and response.expires <= time.monotonic():
+            self.lru.pop(key)
+            response = None
+        if response is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return response
+
+    def put(self, user: str, time_since: datetime.datetime, time_till: datetime.datetime, content: bytes, etag: str, generation: int, variant: str = ''):
+        if generation != self.generation:
+            return
+        key = (user, time_since, time_till, variant)
+        self.lru.put(key, CachedResponse(content, etag, time.monotonic() + self.ttl),
+                     RESPONSE_SIZE + len(content))
+        if key in self.lru:
+            self._keys_by_user[user].add(key)
+
+    def invalidate(self, users: tp.Iterable[str]):
+        self.generation += 1
+        for user in set(users):
+            for key in list(self._keys_by_user.get(user, ())):
+                self.lru.pop(key)
@@ -1,16 +1,25 @@
 import uuid
 import enum
 
-from sqlalchemy import Column, types, ForeignKey, Enum
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, types, ForeignKey, Enum, Index, Computed, text
+from sqlalchemy.dialects.postgresql import UUID, TSRANGE
 from sqlalchemy.orm import declarative_base, relationship
 from proto import calendar_pb2
 Base = declarative_base()
 
+# Bump on every schema change, workers apply the missing DDL on startup
+SCHEMA_VERSION = 6
+
+# Id of the writing transaction. Ids grow monotonically, but commit out of order,
+# so readers compare them to snapshot xmin rather than to the largest id seen
+CURRENT_TRANSACTION_ID = text('pg_current_xact_id()::text::bigint')
+
 
 class User(Base):
     __tablename__ = "users"
     login = Column(types.String, primary_key=True)
+    # Bumped on every write to the user's events, list_events derives its ETag from it
+    version = Column(types.BigInteger, nullable=False, server_default='0')
 
 
 class RepititionRule(enum.Enum):
@@ -34,6 +43,9 @@ class RepititionRule(enum.Enum):
             return RepititionRule.YEARLY
         assert False, f'Unknown repitition rule: {proto}'
 
+    def to_proto(self) -> calendar_pb2.RepititionRule:
+        return calendar_pb2.RepititionRule.Value(self.name)
+
 
 class Event(Base):
     __tablename__ = "events"
@@ -44,10 +56,45 @@ class Event(Base):
     start_time = Column(types.DateTime)
     end_time = Column(types.DateTime)
     repitition_rule = Column(Enum(RepititionRule), default=RepititionRule.NONE)
+    # RRULE-style INTERVAL, COUNT, UNTIL and BYDAY of the rule. Weekdays are a
+    # bitmask, Monday is the lowest bit, and only apply to weekly series
+    repitition_interval = Column(types.BigInteger, nullable=False, server_default='1')
+    repitition_count = Column(types.BigInteger)
+    repitition_until = Column(types.DateTime)
+    repitition_weekdays = Column(types.Integer, nullable=False, server_default='0')
+    # Start of the last occurrence derived from the above, NULL for endless series
+    last_start_time = Column(types.DateTime)
+    # Range all the occurrences start in, unbounded above for endless series.
+    # Windows are matched on it with && through the GiST index
+    active_span = Column(TSRANGE, Computed(
+        "tsrange(start_time, last_start_time, '[]')", persisted=True))
+
+    # Stored copies of the start_time parts recurring series are matched on, so
+    # that they can be indexed. Day of week follows python: Monday is 0
+    start_day_of_week = Column(types.Integer, Computed(
+        'CAST(EXTRACT(ISODOW FROM start_time) AS INTEGER) - 1', persisted=True))
+    start_day_of_month = Column(types.Integer, Computed(
+        'CAST(EXTRACT(DAY FROM start_time) AS INTEGER)', persisted=True))
+    start_day_of_year = Column(types.Integer, Computed(
+        'CAST(EXTRACT(DOY FROM start_time) AS INTEGER)', persisted=True))
+
+    change_seq = Column(types.BigInteger, server_default=CURRENT_TRANSACTION_ID)
 
     participants = relationship(
         'UserEvent', cascade='all, delete-orphan', back_populates='event')
 
+    __table_args__ = (
+        Index('ix_events_rule_start_time', 'repitition_rule', 'start_time'),
+        Index('ix_events_rule_day_of_week_start_time',
+              'repitition_rule', 'start_day_of_week', 'start_time'),
+        Index('ix_events_rule_day_of_month_start_time',
+              'repitition_rule', 'start_day_of_month', 'start_time'),
+        Index('ix_events_rule_day_of_year_start_time',
+              'repitition_rule', 'start_day_of_year', 'start_time'),
+        Index('ix_events_change_seq', 'change_seq'),
+        Index('ix_events_active_span', 'active_span', postgresql_using='gist'),
+    )
+
 
 class UserEvent(Base):
     __tablename__ = "userevents"
@@ -55,4 +102,43 @@ class UserEvent(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user = Column(types.String, ForeignKey('users.login'))
     event_id = Column(UUID(as_uuid=True), ForeignKey('events.id'))
+    change_seq = Column(types.BigInteger, server_default=CURRENT_TRANSACTION_ID)
     event = relationship('Event', back_populates='participants')
+
+    __table_args__ = (
+        Index('ix_userevents_user_event_id', 'user', 'event_id'),
+        # Participants of an event are aggregated from this one without touching the table
+        Index('ix_userevents_event_id_user', 'event_id', 'user'),
+        Index('ix_userevents_user_change_seq', 'user', 'change_seq'),
+    )
+
+
+class Occurrence(Base):
+    __tablename__ = "occurrences"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user = Column(types.String, ForeignKey('users.login'))
+    event_id = Column(UUID(as_uuid=True), ForeignKey('events.id'))
+    start_time = Column(types.DateTime)
+    end_time = Column(types.DateTime)
+    event = relationship('Event')
+
+    __table_args__ = (
+        Index('ix_occurrences_user_start_time', 'user', 'start_time'),
+    )
+
+
+class OccurrenceHorizon(Base):
+    # Single row, occurrences starting in [since, till) are materialized
+    __tablename__ = "occurrence_horizon"
+
+    id = Column(types.Integer, primary_key=True)
+    since = Column(types.DateTime)
+    till = Column(types.DateTime)
+
+
+class SchemaVersion(Base):
+    __tablename__ = "schema_version"
+
+    id = Column(types.Integer, primary_key=True)
+    version = Column(types.Integer)
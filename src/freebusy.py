@@ -0,0 +1,47 @@
+import datetime
+import typing as tp
+
+import numpy as np
+
+
+RESOLUTION = datetime.timedelta(minutes=1)
+WINDOW = datetime.timedelta(weeks=1)
+SLOTS = WINDOW // RESOLUTION
+
+
+def busy_bitmap(start_time: np.ndarray, end_time: np.ndarray, time_since: datetime.datetime) -> np.ndarray:
+    # One element per RESOLUTION slot of the week starting at time_since. A slot
+    # is busy if any event overlaps it, even partially
+    since = np.datetime64(time_since, 'us')
+    resolution = np.timedelta64(RESOLUTION, 'us')
+    first = np.clip((start_time - since) // resolution, 0, SLOTS)
+    last = np.clip(-((since - end_time) // resolution), 0, SLOTS)
+
+    overlaps = np.zeros(SLOTS + 1, dtype=np.int64)
+    np.add.at(overlaps, first, 1)
+    np.add.at(overlaps, last, -1)
+    return np.cumsum(overlaps[:-1]) > 0
+
+
+def group_bitmap(bitmaps: tp.Sequence[np.ndarray]) -> np.ndarray:
+    if not bitmaps:
+        return np.zeros(SLOTS, dtype=bool)
+    return np.logical_or.reduce(bitmaps)
+
+
+def find_free_slot(busy: np.ndarray, duration: datetime.timedelta) -> tp.Optional[int]:
+    # Index of the first slot starting a free run long enough for duration
+    length = -(-duration // RESOLUTION)
+    if length > len(busy):
+        return None
+    if length == 0:
+        return 0
+    busy_before = np.concatenate(([0], np.cumsum(busy)))
+    free = np.flatnonzero(busy_before[length:] == busy_before[:-length])
+    if len(free) == 0:
+        return None
+    return int(free[0])
+
+
+def slot_start(time_since: datetime.datetime, slot: int) -> datetime.datetime:
+    return time_since + slot * RESOLUTION
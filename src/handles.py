@@ -1,17 +1,28 @@
+import asyncio
+import base64
 import datetime
+import hashlib
+import heapq
+import logging
+import operator
+import uuid
+import numpy as np
 from src.routing import route
 from starlette.requests import Request
-from starlette.responses import Response
+from starlette.responses import Response, StreamingResponse
 from proto import calendar_pb2
-from src import datamodel
-from sqlalchemy import select, and_, or_, func
+from src import datamodel, freebusy, instrumentation, metrics, occurrences, queries, recurrence, wire
+from src.cache import OccurrenceCache
+from src.occurrences import OccurrenceIndex
+from sqlalchemy import select, insert, and_, or_
 import sqlalchemy
-from sqlalchemy.orm import selectinload
-from dateutil.relativedelta import relativedelta
+from sqlalchemy.dialects import postgresql
 from google.protobuf.message import DecodeError
 import typing as tp
-from sqlalchemy.ext.asyncio import AsyncSession
-from dataclasses import dataclass
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+
+logger = logging.getLogger(__name__)
 
 
 @route('/ping')
@@ -40,6 +51,135 @@ async def create_user(request: Request):
     return Response(status_code=200)
 
 
+CREATE_USERS_BATCH_SIZE = 10000
+
+
+@route('/create_users', 'POST')
+async def create_users(request: Request):
+    db = request.app.state.db
+
+    req = calendar_pb2.CreateUsersRequest()
+    try:
+        req.ParseFromString(await request.body())
+    except DecodeError:
+        return Response(status_code=400, content='Broken post payload')
+
+    usernames = list(dict.fromkeys(req.usernames))
+    resp = calendar_pb2.CreateUsersResponse()
+    if usernames:
+        async with db() as session:
+            async with session.begin():
+                created = set()
+                # Postgres limits the amount of bind parameters in one statement
+                for i in range(0, len(usernames), CREATE_USERS_BATCH_SIZE):
+                    created.update((await session.scalars(
+                        postgresql.insert(datamodel.User)
+                        .values([dict(login=username) for username in usernames[i:i + CREATE_USERS_BATCH_SIZE]])
+                        .on_conflict_do_nothing(index_elements=[datamodel.User.login])
+                        .returning(datamodel.User.login)
+                    )).all())
+            await session.commit()
+        for username in usernames:
+            if username in created:
+                resp.created.append(username)
+            else:
+                resp.existing.append(username)
+    return Response(status_code=200, content=resp.SerializeToString())
+
+
+def invalidate_users(app, users: tp.Iterable[str]):
+    # Called once the transaction touching users' calendars is committed
+    users = set(users)
+    if app.state.occurrence_cache is not None:
+        app.state.occurrence_cache.invalidate(users)
+    if app.state.response_cache is not None:
+        app.state.response_cache.invalidate(users)
+
+
+@route('/cache_stats', 'GET')
+async def cache_stats(request: Request):
+    lines = []
+    occurrence_cache = request.app.state.occurrence_cache
+    if occurrence_cache is not None:
+        lines.append(f'occurrence_cache_hits {occurrence_cache.hits}')
+        lines.append(f'occurrence_cache_misses {occurrence_cache.misses}')
+        lines.append(f'occurrence_cache_entries {len(occurrence_cache.lru)}')
+        lines.append(f'occurrence_cache_bytes {occurrence_cache.lru.size}')
+    response_cache = request.app.state.response_cache
+    if response_cache is not None:
+        lines.append(f'response_cache_hits {response_cache.hits}')
+        lines.append(f'response_cache_misses {response_cache.misses}')
+        lines.append(f'response_cache_entries {len(response_cache.lru)}')
+        lines.append(f'response_cache_bytes {response_cache.lru.size}')
+    return Response(status_code=200, content=''.join(line + '\n' for line in lines), media_type='text/plain')
+
+
+@route('/metrics', 'GET')
+async def metrics_handle(request: Request):
+    exposition = metrics.Exposition()
+    metrics.render_routes(exposition)
+    metrics.render_pool(exposition, request.app.state.engine.sync_engine.pool)
+
+    occurrence_cache = request.app.state.occurrence_cache
+    if occurrence_cache is not None:
+        for name, kind, help, value in [
+            ('calendar_occurrence_cache_hits_total', 'counter',
+             'Occurrence cache lookups served from memory', occurrence_cache.hits),
+            ('calendar_occurrence_cache_misses_total', 'counter',
+             'Occurrence cache lookups that went to the database', occurrence_cache.misses),
+            ('calendar_occurrence_cache_entries', 'gauge',
+             'Cached (user, week) buckets', len(occurrence_cache.lru)),
+            ('calendar_occurrence_cache_bytes', 'gauge',
+             'Estimated size of the cached occurrences', occurrence_cache.lru.size),
+        ]:
+            exposition.metric(name, kind, help)
+            exposition.sample(name, value)
+
+    response_cache = request.app.state.response_cache
+    if response_cache is not None:
+        for name, kind, help, value in [
+            ('calendar_response_cache_hits_total', 'counter',
+             'list_events responses served from memory', response_cache.hits),
+            ('calendar_response_cache_misses_total', 'counter',
+             'list_events responses built from the database', response_cache.misses),
+            ('calendar_response_cache_entries', 'gauge',
+             'Cached list_events responses', len(response_cache.lru)),
+            ('calendar_response_cache_bytes', 'gauge',
+             'Estimated size of the cached responses', response_cache.lru.size),
+        ]:
+            exposition.metric(name, kind, help)
+            exposition.sample(name, value)
+
+    return Response(status_code=200, content=exposition.render(), media_type='text/plain; version=0.0.4')
+
+
+def repitition_fields(req: calendar_pb2.Event) -> tp.Dict[str, tp.Any]:
+    # Columns of the rule beyond its kind, raises ValueError on a rule that can't be stored
+    rule = datamodel.RepititionRule.from_proto(req.repitition_rule)
+    if req.repitition_weekdays and rule != datamodel.RepititionRule.WEEKLY:
+        raise ValueError('Days of week are supported by weekly repitition only')
+    for weekday in req.repitition_weekdays:
+        if weekday not in calendar_pb2.Weekday.values():
+            raise ValueError(f'Unknown day of week: {weekday}')
+    if req.HasField('repitition_until') and req.repitition_until.ToDatetime() < req.start_time.ToDatetime():
+        raise ValueError('Repitition ends before the event starts')
+    if req.repitition_interval > recurrence.MAX_INTERVAL:
+        raise ValueError(f'Repitition interval is too long: {req.repitition_interval}')
+    interval = req.repitition_interval or 1
+    count = req.repitition_count or None
+    until = req.repitition_until.ToDatetime() if req.HasField('repitition_until') else None
+    weekdays = recurrence.weekdays_mask(req.repitition_weekdays)
+    return dict(
+        repitition_rule=rule,
+        repitition_interval=interval,
+        repitition_count=count,
+        repitition_until=until,
+        repitition_weekdays=weekdays,
+        last_start_time=recurrence.last_start_time(
+            rule, req.start_time.ToDatetime(), interval, count, until, weekdays),
+    )
+
+
 @route('/create_event', 'POST')
 async def create_event(request: Request):
     db = request.app.state.db
@@ -49,6 +189,10 @@ async def create_event(request: Request):
         req.ParseFromString(await request.body())
     except DecodeError:
         return Response(status_code=400, content='Broken post payload')
+    try:
+        fields = repitition_fields(req)
+    except ValueError as e:
+        return Response(status_code=400, content=str(e))
 
     try:
         async with db() as session:
@@ -57,8 +201,7 @@ async def create_event(request: Request):
                     author=req.user,
                     start_time=req.start_time.ToDatetime(),
                     end_time=req.end_time.ToDatetime(),
-                    repitition_rule=datamodel.RepititionRule.from_proto(
-                        req.repitition_rule)
+                    **fields
                 )
                 session.add(event)
 
@@ -67,182 +210,495 @@ async def create_event(request: Request):
                 for user in req.participants:
                     event.participants.append(
                         datamodel.UserEvent(user=user, event_id=event.id))
+                await session.execute(queries.bump_user_versions({req.user, *req.participants}))
+
+                occurrence_index = request.app.state.occurrence_index
+                if occurrence_index is not None:
+                    await session.flush()
+                    await occurrence_index.add_events(session, [event], [{req.user, *req.participants}])
             await session.commit()
     except sqlalchemy.exc.IntegrityError:
         return Response(status_code=400, content=f'Wrong username {req.user}')
 
+    invalidate_users(request.app, [req.user, *req.participants])
     return Response(status_code=200)
 
 
-@dataclass
-class Event:
-    author: str
-    start_time: datetime.datetime
-    end_time: datetime.datetime
-    participants: tp.List[str]
+@route('/create_events', 'POST')
+async def create_events(request: Request):
+    db = request.app.state.db
+
+    req = calendar_pb2.CreateEventsRequest()
+    try:
+        req.ParseFromString(await request.body())
+    except DecodeError:
+        return Response(status_code=400, content='Broken post payload')
 
+    usernames = set()
+    for req_event in req.events:
+        usernames.add(req_event.user)
+        usernames.update(req_event.participants)
+
+    resp = calendar_pb2.CreateEventsResponse()
+    async with db() as session:
+        async with session.begin():
+            known_users = set((await session.scalars(
+                select(datamodel.User.login).where(datamodel.User.login.in_(usernames)))).all())
+
+            events, user_events, participants = [], [], []
+            for req_event in req.events:
+                result: calendar_pb2.CreateEventResult = resp.results.add()
+                unknown_users = [user for user in [req_event.user, *req_event.participants]
+                                 if user not in known_users]
+                if unknown_users:
+                    result.error = f'Wrong username {unknown_users[0]}'
+                    continue
+                if req_event.repitition_rule not in calendar_pb2.RepititionRule.values():
+                    result.error = f'Unknown repitition rule: {req_event.repitition_rule}'
+                    continue
+                try:
+                    fields = repitition_fields(req_event)
+                except ValueError as e:
+                    result.error = str(e)
+                    continue
+
+                event_id = uuid.uuid4()
+                events.append(dict(
+                    id=event_id,
+                    author=req_event.user,
+                    start_time=req_event.start_time.ToDatetime(),
+                    end_time=req_event.end_time.ToDatetime(),
+                    **fields
+                ))
+                for user in [req_event.user, *req_event.participants]:
+                    user_events.append(
+                        dict(id=uuid.uuid4(), user=user, event_id=event_id))
+                participants.append({req_event.user, *req_event.participants})
+                result.ok = True
+
+            if events:
+                await session.execute(insert(datamodel.Event), events)
+                await session.execute(insert(datamodel.UserEvent), user_events)
+                await session.execute(queries.bump_user_versions(set().union(*participants)))
+
+                occurrence_index = request.app.state.occurrence_index
+                if occurrence_index is not None:
+                    await occurrence_index.add_events(
+                        session,
+                        [datamodel.Event(**event) for event in events],
+                        participants)
+        await session.commit()
+
+    invalidate_users(request.app, set().union(*participants))
+    return Response(status_code=200, content=resp.SerializeToString())
+
+
+EXPANSION_BATCH_SIZE = 1000
+# Connections a single listing may hold on top of its session's one
+MAX_QUERY_FANOUT = 2
+# Sequence of length-delimited calendar_pb2.Event messages
+STREAM_MEDIA_TYPE = 'application/x-protobuf-delimited'
+
+
+class Event(tp.NamedTuple):
+    event_id: uuid.UUID
+    author: str
+    # Microseconds since the epoch, UTC
+    start_time: int
+    end_time: int
+    # Shared by all occurrences of a series, must not be modified
+    participants: tp.Sequence[str]
+
+
+def day_range_query(column, first: int, last: int, wraps: bool, slack: int = 0):
+    # Wrapping range goes over the end of the week/month/year: [first, end] + [start, last]
+    if wraps:
+        return or_(column >= first - slack, column <= last + slack)
+    return and_(column >= first - slack, column <= last + slack)
+
+
+async def list_events_for_users(users: tp.List[str], db: AsyncSession, time_since: datetime.datetime, time_till: datetime.datetime, occurrence_index: tp.Optional[OccurrenceIndex] = None, occurrence_cache: tp.Optional[OccurrenceCache] = None) -> tp.AsyncGenerator[Event, None]:
+    if occurrence_cache is not None:
+        async for occurrence in occurrence_cache.list_events(users, db, time_since, time_till):
+            yield Event(occurrence.event_id, occurrence.author, occurrence.start_time, occurrence.end_time, occurrence.participants)
+        return
+
+    if occurrence_index is not None and occurrence_index.covers(time_since, time_till):
+        result = await db.stream(occurrences.select_occurrences(users, time_since, time_till))
+        participants_by_event = {}
+        async for row in result:
+            instrumentation.count_rows(1)
+            participants = participants_by_event.setdefault(
+                row.id, row.participants)
+            yield Event(row.id, row.author, recurrence.to_epoch_us(row.start_time), recurrence.to_epoch_us(row.end_time), participants)
+        return
 
-async def list_events_for_users(users: tp.List[str], db: AsyncSession, time_since: datetime.datetime, time_till: datetime.datetime) -> tp.AsyncGenerator[Event, None]:
     daily_repition_query = (
         datamodel.Event.repitition_rule == datamodel.RepititionRule.DAILY)
-    if time_till - time_since >= datetime.timedelta(weeks=1):
+
+    days = (time_till.date() - time_since.date()).days
+    if days >= 6:
         weekly_repitition_query = (
             datamodel.Event.repitition_rule == datamodel.RepititionRule.WEEKLY)
     else:
-        if time_since.weekday() <= time_till.weekday():
-            weekly_repitition_query = and_(
-                datamodel.Event.repitition_rule == datamodel.RepititionRule.WEEKLY,
-                func.extract(
-                    'dow', datamodel.Event.start_time) >= time_since.weekday(),
-                func.extract(
-                    'dow', datamodel.Event.start_time) <= time_till.weekday(),
-            )
-        else:
-            weekly_repitition_query = and_(
-                datamodel.Event.repitition_rule == datamodel.RepititionRule.WEEKLY,
-                or_(
-                    func.extract(
-                        'dow', datamodel.Event.start_time) >= time_since.weekday(),
-                    func.extract(
-                        'dow', datamodel.Event.start_time) <= time_till.weekday(),
-                )
+        # Series repeating on several days of week are matched on any of them
+        window_weekdays = recurrence.weekdays_mask(
+            (time_since.weekday() + i) % 7 for i in range(days + 1))
+        weekly_repitition_query = and_(
+            datamodel.Event.repitition_rule == datamodel.RepititionRule.WEEKLY,
+            or_(
+                and_(
+                    datamodel.Event.repitition_weekdays == 0,
+                    day_range_query(datamodel.Event.start_day_of_week, time_since.weekday(),
+                                    time_till.weekday(), wraps=time_since.weekday() + days >= 7),
+                ),
+                datamodel.Event.repitition_weekdays.op('&')(window_weekdays) != 0,
             )
-    if relativedelta(time_till, time_since).months > 0:
+        )
+
+    months = (time_till.year - time_since.year) * \
+        12 + time_till.month - time_since.month
+    if months >= 2:
         monthly_repitition_query = (
             datamodel.Event.repitition_rule == datamodel.RepititionRule.MONTHLY)
     else:
-        if time_since.day <= time_till.day:
-            monthly_repitition_query = and_(
-                datamodel.Event.repitition_rule == datamodel.RepititionRule.MONTHLY,
-                func.extract(
-                    'day', datamodel.Event.start_time) >= time_since.day,
-                func.extract(
-                    'day', datamodel.Event.start_time) <= time_till.day,
-            )
-        else:
-            monthly_repitition_query = and_(
-                datamodel.Event.repitition_rule == datamodel.RepititionRule.MONTHLY,
-                or_(
-                    func.extract(
-                        'day', datamodel.Event.start_time) >= time_since.day,
-                    func.extract(
-                        'day', datamodel.Event.start_time) <= time_till.day,
-                )
-            )
+        monthly_repitition_query = and_(
+            datamodel.Event.repitition_rule == datamodel.RepititionRule.MONTHLY,
+            day_range_query(datamodel.Event.start_day_of_month,
+                            time_since.day, time_till.day, wraps=months == 1)
+        )
 
-    if relativedelta(time_till, time_since).years > 0:
+    years = time_till.year - time_since.year
+    if years >= 2:
         yearly_repitition_query = (
             datamodel.Event.repitition_rule == datamodel.RepititionRule.YEARLY
         )
     else:
-        if time_since.timetuple().tm_yday < time_since.timetuple().tm_yday:
-            yearly_repitition_query = and_(
-                datamodel.Event.repitition_rule == datamodel.RepititionRule.YEARLY,
-                func.extract(
-                    'doy', datamodel.Event.start_time) >= time_since.timetuple().tm_yday,
-                func.extract(
-                    'doy', datamodel.Event.end_time) <= time_till.timetuple().tm_yday
-            )
-        else:
-            yearly_repitition_query = and_(
-                datamodel.Event.repitition_rule == datamodel.RepititionRule.YEARLY,
-                or_(
-                    func.extract(
-                        'doy', datamodel.Event.start_time) >= time_since.timetuple().tm_yday,
-                    func.extract(
-                        'doy', datamodel.Event.end_time) <= time_till.timetuple().tm_yday
-                )
-            )
+        # Day of year of the same date differs by one in leap years
+        yearly_repitition_query = and_(
+            datamodel.Event.repitition_rule == datamodel.RepititionRule.YEARLY,
+            day_range_query(datamodel.Event.start_day_of_year, time_since.timetuple().tm_yday,
+                            time_till.timetuple().tm_yday, wraps=years == 1, slack=1)
+        )
 
-    query = (select(datamodel.Event).where(
+    rule_queries = [
         and_(
-            (datamodel.UserEvent.user == users[0]) if len(
-                users) == 0 else (datamodel.UserEvent.user.in_(users)),
-            datamodel.Event.start_time <= time_till,
-            or_(
-                and_(
-                    datamodel.Event.repitition_rule == datamodel.RepititionRule.NONE,
-                    datamodel.Event.start_time >= time_since,
-                ),
-                daily_repition_query,
-                weekly_repitition_query,
-                monthly_repitition_query,
-                yearly_repitition_query
-            )
-        )
-    )
-        .join(datamodel.UserEvent, datamodel.Event.id == datamodel.UserEvent.event_id)
-        .options(selectinload(datamodel.Event.participants))
-    )
+            datamodel.Event.repitition_rule == datamodel.RepititionRule.NONE,
+            datamodel.Event.start_time >= time_since,
+        ),
+        daily_repition_query,
+        weekly_repitition_query,
+        monthly_repitition_query,
+        yearly_repitition_query
+    ]
+
+    # Each class is a simple index range on its own. They run concurrently on
+    # connections of their own, at most MAX_QUERY_FANOUT at a time, and yield
+    # sorted chunks, so a heap merge sorts the output
+    fanout = asyncio.Semaphore(MAX_QUERY_FANOUT)
+    sources = [expand_one_offs(db.bind, fanout, queries.select_series(users).where(
+        and_(queries.active_between(time_since, time_till), rule_queries[0])), time_since, time_till)]
+    sources.extend(expand_recurring(db.bind, fanout, queries.select_series(users).where(
+        and_(queries.active_between(time_since, time_till), rule_query)), time_since, time_till)
+        for rule_query in rule_queries[1:])
+    async for event in merge_chunks(sources, key=operator.attrgetter('start_time')):
+        yield event
+
+
+def occurrence_events(rows, occurrences: recurrence.Occurrences) -> tp.List[Event]:
+    order = np.argsort(occurrences.start_time, kind='stable')
+    return [Event(rows[series].id, rows[series].author, start_time, end_time, rows[series].participants)
+            for series, start_time, end_time in zip(occurrences.series[order].tolist(), occurrences.start_time[order].astype(np.int64).tolist(), occurrences.end_time[order].astype(np.int64).tolist())]
+
+
+async def expand_one_offs(engine: AsyncEngine, fanout: asyncio.Semaphore, query, time_since: datetime.datetime, time_till: datetime.datetime) -> tp.AsyncGenerator[tp.List[Event], None]:
+    # Ordered by (start time, event id), so every page is the next sorted chunk.
+    # No connection is held while a page is being merged
+    query = query.order_by(datamodel.Event.start_time, datamodel.Event.id).limit(EXPANSION_BATCH_SIZE)
+    page_query = query
+    while True:
+        async with fanout, engine.connect() as conn:
+            rows = (await conn.execute(page_query)).all()
+        events = occurrence_events(rows, recurrence.expand_series(rows, time_since, time_till))
+        if events:
+            yield events
+        if len(rows) < EXPANSION_BATCH_SIZE:
+            return
+        page_query = query.where(sqlalchemy.tuple_(datamodel.Event.start_time, datamodel.Event.id) > sqlalchemy.tuple_(
+            rows[-1].start_time, rows[-1].id))
+
+
+STREAM_CHUNK = datetime.timedelta(days=1)
+
+
+async def expand_recurring(engine: AsyncEngine, fanout: asyncio.Semaphore, query, time_since: datetime.datetime, time_till: datetime.datetime) -> tp.AsyncGenerator[tp.List[Event], None]:
+    # Occurrences of a series are spread over the whole window, so the series are
+    # held and expanded over consecutive chunks of time. Chunks grow or shrink to
+    # keep about EXPANSION_BATCH_SIZE occurrences in memory
+    async with fanout, engine.connect() as conn:
+        rows = (await conn.execute(query)).all()
+    if not rows:
+        return
+
+    series = recurrence.to_series(rows)
+    chunk_since, chunk = time_since, STREAM_CHUNK
+    while chunk_since < time_till:
+        chunk_till = min(chunk_since + chunk, time_till)
+        occurrences = recurrence.expand(series, chunk_since, chunk_till)
+        if len(occurrences):
+            yield occurrence_events(rows, occurrences)
+        if len(occurrences) < EXPANSION_BATCH_SIZE // 2:
+            chunk *= 2
+        elif len(occurrences) > EXPANSION_BATCH_SIZE * 2 and chunk > recurrence.MICROSECOND:
+            chunk /= 2
+        chunk_since = chunk_till
+
+
+async def merge_chunks(sources: tp.Sequence[tp.AsyncGenerator[tp.List[Event], None]], key) -> tp.AsyncGenerator[Event, None]:
+    # heapq.merge over async generators of sorted chunks. First chunks are
+    # fetched concurrently, the following ones once the previous is used up
+    async def next_chunk(source) -> tp.List[Event]:
+        async for chunk in source:
+            return chunk
+        return []
 
-    result = await db.stream_scalars(query)
-    async for row in result:
-        participants = [participant.user for participant in row.participants]
-        event_duration = row.end_time - row.start_time
-        if row.repitition_rule == datamodel.RepititionRule.NONE:
-            yield Event(
-                author=row.author,
-                start_time=row.start_time,
-                end_time=row.end_time,
-                participants=participants
-            )
-        elif row.repitition_rule == datamodel.RepititionRule.DAILY:
-            for i in range((time_till - time_since).days):
-                yield Event(
-                    author=row.author,
-                    start_time=datetime.datetime.combine(
-                        time_since.date() + datetime.timedelta(days=i), row.start_time.time()),
-                    end_time=datetime.datetime.combine(time_since.date(
-                    ) + datetime.timedelta(days=i), row.start_time.time()) + event_duration,
-                    participants=participants
-                )
-        elif row.repitition_rule == datamodel.RepititionRule.WEEKLY:
-            this_event_start_time = row.start_time.replace(
-                year=time_since.year, month=time_since.month, day=time_since.day)
-            this_event_start_time += datetime.timedelta(
-                days=(row.start_time.weekday() - time_since.weekday() + 7) % 7)
-            if this_event_start_time < time_since:
-                continue
-            while this_event_start_time <= time_till:
-                yield Event(
-                    author=row.author,
-                    start_time=this_event_start_time,
-                    end_time=this_event_start_time + event_duration,
-                    participants=participants
-                )
-                this_event_start_time += datetime.timedelta(days=7)
-        elif row.repitition_rule == datamodel.RepititionRule.MONTHLY:
-            for i in range(relativedelta(time_since, row.start_time.date()).months, relativedelta(time_till, row.start_time.date()).months + 1):
-                this_event_start_time = row.start_time + \
-                    relativedelta(months=i)
-                if this_event_start_time.day != row.start_time.day:
-                    continue
-                if this_event_start_time < time_since:
-                    continue
-                if this_event_start_time > time_till:
-                    continue
-                yield Event(
-                    author=row.author,
-                    start_time=this_event_start_time,
-                    end_time=this_event_start_time + event_duration,
-                    participants=participants
-                )
-        elif row.repitition_rule == datamodel.RepititionRule.YEARLY:
-            for i in range(relativedelta(time_since, row.start_time.date()).years, relativedelta(time_till, row.start_time.date()).years + 1):
-                this_event_start_time = row.start_time + \
-                    relativedelta(years=i)
-                if this_event_start_time.day != row.start_time.day and this_event_start_time.month != row.start_time.month:
-                    continue
-                if this_event_start_time < time_since:
-                    continue
-                if this_event_start_time > time_till:
+    try:
+        # A failed source cancels the others, so that none is left running when closed
+        tasks = [asyncio.ensure_future(next_chunk(source)) for source in sources]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        for task in tasks:
+            if not task.cancelled() and task.exception() is not None:
+                raise task.exception()
+        chunks = [task.result() for task in tasks]
+        heap = [(key(chunk[0]), i, 0) for i, chunk in enumerate(chunks) if chunk]
+        heapq.heapify(heap)
+        while heap:
+            _, i, position = heap[0]
+            yield chunks[i][position]
+            position += 1
+            if position == len(chunks[i]):
+                chunks[i], position = await next_chunk(sources[i]), 0
+                if not chunks[i]:
+                    heapq.heappop(heap)
                     continue
-                yield Event(
-                    author=row.author,
-                    start_time=this_event_start_time,
-                    end_time=this_event_start_time + event_duration,
-                    participants=participants
-                )
+            heapq.heapreplace(heap, (key(chunks[i][position]), i, position))
+    finally:
+        for source in sources:
+            try:
+                await source.aclose()
+            except Exception:
+                logger.exception('Failed to close event source')
+
+
+MAX_PAGE_SIZE = 10000
+PAGE_CHUNK = datetime.timedelta(weeks=1)
+# (start time in microseconds, event id) of the last occurrence of a page
+PageKey = tp.Tuple[int, uuid.UUID]
+
+
+def encode_cursor(key: PageKey) -> str:
+    return base64.urlsafe_b64encode(f'{key[0]}:{key[1]}'.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> PageKey:
+    try:
+        start_time, event_id = base64.urlsafe_b64decode(
+            cursor.encode()).decode().split(':')
+        return int(start_time), uuid.UUID(event_id)
+    except (ValueError, UnicodeError):
+        raise ValueError(f'Broken cursor {cursor}')
+
+
+async def list_events_page(users: tp.List[str], db: AsyncSession, time_since: datetime.datetime, time_till: datetime.datetime, limit: int, after: tp.Optional[PageKey]) -> tp.Tuple[tp.List[Event], tp.Optional[PageKey]]:
+    # Occurrences ordered by (start time, event id) following `after`. Series are
+    # followed from their own start, as in the occurrence cache, so that pages
+    # expanded over different windows agree with each other
+    since = time_since
+    if after is not None:
+        since = max(since, recurrence.EPOCH + after[0] * recurrence.MICROSECOND)
+
+    one_off_query = queries.select_series(users).where(and_(
+        datamodel.Event.repitition_rule == datamodel.RepititionRule.NONE,
+        datamodel.Event.start_time >= since,
+        datamodel.Event.start_time < time_till,
+    ))
+    if after is not None:
+        one_off_query = one_off_query.where(sqlalchemy.tuple_(datamodel.Event.start_time, datamodel.Event.id) > sqlalchemy.tuple_(
+            since, after[1]))
+    one_offs = (await db.execute(one_off_query.order_by(datamodel.Event.start_time, datamodel.Event.id).limit(limit + 1))).all()
+    candidates = [((recurrence.to_epoch_us(row.start_time), row.id), Event(row.id, row.author, recurrence.to_epoch_us(
+        row.start_time), recurrence.to_epoch_us(row.end_time), row.participants)) for row in one_offs]
+
+    # Nothing after the first one-off event that didn't fit can make it to the
+    # page, occurrences starting at the same time still can
+    page_till = time_till if len(one_offs) <= limit else one_offs[limit].start_time + recurrence.MICROSECOND
+    series = (await db.execute(queries.select_series(users).where(and_(
+        datamodel.Event.repitition_rule != datamodel.RepititionRule.NONE,
+        queries.active_between(since, page_till),
+    )))).all()
+    instrumentation.count_rows(len(one_offs) + len(series))
+
+    # Series are expanded over growing chunks until the page is full, everything
+    # starting before `complete_till` is known
+    complete_till = page_till
+    chunk_since, chunk = since, PAGE_CHUNK
+    while series and chunk_since < complete_till:
+        chunk_till = min(chunk_since + chunk, page_till)
+        expanded = recurrence.expand_series(series, chunk_since, chunk_till)
+        for i, start_time, end_time in zip(expanded.series.tolist(), expanded.start_time.astype(np.int64).tolist(), expanded.end_time.astype(np.int64).tolist()):
+            candidates.append(((start_time, series[i].id), Event(
+                series[i].id, series[i].author, start_time, end_time, series[i].participants)))
+        chunk_since, chunk = chunk_till, chunk * 2
+        till_us = recurrence.to_epoch_us(chunk_till)
+        if sum(1 for key, _ in candidates if key[0] < till_us and (after is None or key > after)) > limit:
+            complete_till = chunk_till
+            break
+
+    complete_till_us = recurrence.to_epoch_us(complete_till)
+    candidates = sorted((candidate for candidate in candidates
+                         if candidate[0][0] < complete_till_us and (after is None or candidate[0] > after)),
+                        key=operator.itemgetter(0))
+    if len(candidates) <= limit:
+        return [event for _, event in candidates], None
+    return [event for _, event in candidates[:limit]], candidates[limit - 1][0]
+
+
+EVENTS_TAG = wire.tag(calendar_pb2.ListEventsResp.DESCRIPTOR.fields_by_name['events'].number, wire.LENGTH_DELIMITED)
+START_TIME_TAG = wire.tag(calendar_pb2.Event.DESCRIPTOR.fields_by_name['start_time'].number, wire.LENGTH_DELIMITED)
+END_TIME_TAG = wire.tag(calendar_pb2.Event.DESCRIPTOR.fields_by_name['end_time'].number, wire.LENGTH_DELIMITED)
+BATCH_EVENTS_TAG = wire.tag(calendar_pb2.ListEventsBatchResp.DESCRIPTOR.fields_by_name['events'].number, wire.LENGTH_DELIMITED)
+COMPACT_BATCH_EVENTS_FIELD = calendar_pb2.CompactEventsBatchResp.DESCRIPTOR.fields_by_name['events'].number
+
+
+class EventEncoder:
+    # Produces the same bytes as a calendar_pb2.Event filled from the occurrence.
+    # Protobuf writes fields in field number order, so the fields of a series are
+    # encoded once and the timestamps go between user and participants
+    def __init__(self):
+        self._series: tp.Dict[uuid.UUID, tp.Tuple[bytes, bytes]] = {}
+
+    def encode(self, event: Event) -> bytes:
+        series = self._series.get(event.event_id)
+        if series is None:
+            series = self._series[event.event_id] = (
+                calendar_pb2.Event(user=event.author).SerializeToString(),
+                calendar_pb2.Event(participants=event.participants).SerializeToString(),
+            )
+        return b''.join((
+            series[0],
+            START_TIME_TAG, wire.delimited(wire.encode_timestamp(event.start_time)),
+            END_TIME_TAG, wire.delimited(wire.encode_timestamp(event.end_time)),
+            series[1],
+        ))
+
+    def encode_field(self, event: Event, tag: bytes = EVENTS_TAG) -> bytes:
+        # As an element of ListEventsResp.events by default
+        return tag + wire.delimited(self.encode(event))
+
+
+class ListEventsEncoder:
+    # Builds calendar_pb2.ListEventsResp, the same interface as CompactEncoder
+    media_type = None
+
+    def __init__(self, tag: bytes = EVENTS_TAG):
+        self._tag = tag
+        self._events = EventEncoder()
+        self._parts: tp.List[bytes] = []
+
+    def __len__(self):
+        return len(self._parts)
+
+    def add(self, event: Event):
+        self._parts.append(self._events.encode_field(event, self._tag))
+
+    def encode(self, next_cursor: str = '') -> bytes:
+        self._parts.append(calendar_pb2.ListEventsResp(
+            next_cursor=next_cursor).SerializeToString())
+        return b''.join(self._parts)
+
+
+COMPACT_MEDIA_TYPE = 'application/x-protobuf-compact'
+
+
+def accepts_compact(request: Request) -> bool:
+    return COMPACT_MEDIA_TYPE in request.headers.get('Accept', '')
+
+
+OCCURRENCE_SERIES_FIELD = calendar_pb2.CompactEventsResp.DESCRIPTOR.fields_by_name['occurrence_series'].number
+START_OFFSETS_FIELD = calendar_pb2.CompactEventsResp.DESCRIPTOR.fields_by_name['start_offsets'].number
+DURATIONS_FIELD = calendar_pb2.CompactEventsResp.DESCRIPTOR.fields_by_name['durations'].number
+
+
+class CompactEncoder:
+    # Builds calendar_pb2.CompactEventsResp. The columns are encoded with numpy and
+    # spliced between the dictionaries and next_cursor, following field number order
+    media_type = COMPACT_MEDIA_TYPE
+
+    def __init__(self, time_since: datetime.datetime):
+        self.resp = calendar_pb2.CompactEventsResp()
+        self.resp.since.FromDatetime(time_since)
+        self._since = recurrence.to_epoch_us(time_since)
+        self._users: tp.Dict[str, int] = {}
+        self._series: tp.Dict[uuid.UUID, int] = {}
+        self._occurrence_series: tp.List[int] = []
+        self._start_times: tp.List[int] = []
+        self._end_times: tp.List[int] = []
+
+    def __len__(self):
+        return len(self._occurrence_series)
+
+    def _user(self, user: str) -> int:
+        index = self._users.get(user)
+        if index is None:
+            index = self._users[user] = len(self.resp.users)
+            self.resp.users.append(user)
+        return index
+
+    def add(self, event: Event):
+        series = self._series.get(event.event_id)
+        if series is None:
+            series = self._series[event.event_id] = len(self.resp.series)
+            self.resp.series.add(user=self._user(event.author), participants=[
+                                 self._user(user) for user in event.participants])
+        self._occurrence_series.append(series)
+        self._start_times.append(event.start_time)
+        self._end_times.append(event.end_time)
+
+    def encode(self, next_cursor: str = '') -> bytes:
+        start_time = np.array(self._start_times, dtype=np.int64)
+        end_time = np.array(self._end_times, dtype=np.int64)
+        return b''.join((
+            self.resp.SerializeToString(),
+            wire.packed_field(OCCURRENCE_SERIES_FIELD, wire.encode_varints(
+                np.array(self._occurrence_series, dtype=np.uint64))),
+            wire.packed_field(START_OFFSETS_FIELD, wire.encode_varints(
+                wire.zigzag(start_time - self._since))),
+            wire.packed_field(DURATIONS_FIELD, wire.encode_varints(
+                wire.zigzag(end_time - start_time))),
+            calendar_pb2.CompactEventsResp(
+                next_cursor=next_cursor).SerializeToString(),
+        ))
+
+
+def list_events_etag(username: str, version: tp.Optional[int], query: str) -> str:
+    # The query string covers the window and the representation
+    key = f'{username}\n{version}\n{query}'
+    return '"{}"'.format(hashlib.sha256(key.encode()).hexdigest()[:32])
+
+
+def etag_matches(if_none_match: tp.Optional[str], etag: str) -> bool:
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    # If-None-Match uses the weak comparison
+    tags = [tag.strip() for tag in if_none_match.split(',')]
+    return any(tag == etag or tag == 'W/' + etag for tag in tags)
 
 
 @route('/list_events', 'GET')
@@ -257,16 +713,145 @@ async def list_events(request: Request):
     if time_till <= time_since:
         return Response(status_code=400, content='time_till <= time_since')
 
-    resp = calendar_pb2.ListEventsResp()
+    stream = request.query_params.get('stream', '0') != '0'
+
+    limit, after = None, None
+    if 'limit' in request.query_params:
+        try:
+            limit = int(request.query_params['limit'])
+            if request.query_params.get('cursor'):
+                after = decode_cursor(request.query_params['cursor'])
+        except ValueError as e:
+            return Response(status_code=400, content=str(e))
+        if not 0 < limit <= MAX_PAGE_SIZE:
+            return Response(status_code=400, content=f'limit must be in [1, {MAX_PAGE_SIZE}]')
+
+    compact = accepts_compact(request) and not stream
+    variant = 'compact' if compact else ''
+
+    response_cache = request.app.state.response_cache
+    if response_cache is not None and not stream and limit is None:
+        cached = response_cache.get(username, time_since, time_till, variant)
+        if cached is not None:
+            headers = {'ETag': cached.etag, 'Vary': 'Accept'}
+            if etag_matches(request.headers.get('If-None-Match'), cached.etag):
+                return Response(status_code=304, headers=headers)
+            return Response(status_code=200, content=cached.content, headers=headers,
+                            media_type=COMPACT_MEDIA_TYPE if compact else None)
+        generation = response_cache.generation
+
+    # Read before the events, so that a concurrent write can only make the ETag stale, never the content
+    async with db() as session:
+        version = await session.scalar(queries.select_user_version(username))
+    etag = list_events_etag(username, version, f'{request.url.query}\n{variant}')
+    headers = {'ETag': etag, 'Vary': 'Accept'}
+    if etag_matches(request.headers.get('If-None-Match'), etag):
+        return Response(status_code=304, headers=headers)
+
+    if stream and limit is None:
+        return StreamingResponse(
+            stream_events(db, username, time_since, time_till,
+                          request.app.state.occurrence_index, request.app.state.occurrence_cache),
+            status_code=200, media_type=STREAM_MEDIA_TYPE, headers=headers)
+
+    encoder = CompactEncoder(time_since) if compact else ListEventsEncoder()
 
+    if limit is not None:
+        async with db() as session:
+            async with session.begin():
+                events, next_key = await list_events_page([username], session, time_since, time_till, limit, after)
+        for event in events:
+            encoder.add(event)
+        content = encoder.encode(
+            '' if next_key is None else encode_cursor(next_key))
+        return Response(status_code=200, content=content, headers=headers, media_type=encoder.media_type)
+
+    async with db() as session:
+        async with session.begin():
+            async for event in list_events_for_users([username], session, time_since, time_till, request.app.state.occurrence_index, request.app.state.occurrence_cache):
+                encoder.add(event)
+
+    content = encoder.encode()
+    if response_cache is not None:
+        response_cache.put(username, time_since, time_till,
+                           content, etag, generation, variant)
+    return Response(status_code=200, content=content, headers=headers, media_type=encoder.media_type)
+
+
+async def stream_events(db, username: str, time_since: datetime.datetime, time_till: datetime.datetime, occurrence_index: tp.Optional[OccurrenceIndex], occurrence_cache: tp.Optional[OccurrenceCache]) -> tp.AsyncGenerator[bytes, None]:
     async with db() as session:
         async with session.begin():
-            async for event in list_events_for_users([username], session, time_since, time_till):
-                elem: calendar_pb2.Event = resp.events.add()
-                elem.user = event.author
-                elem.start_time.FromDatetime(event.start_time)
-                elem.end_time.FromDatetime(event.end_time)
-                elem.participants.extend(event.participants)
+            encoder = EventEncoder()
+            async for event in list_events_for_users([username], session, time_since, time_till, occurrence_index, occurrence_cache):
+                yield wire.delimited(encoder.encode(event))
+
+
+@route('/list_events_batch', 'POST')
+async def list_events_batch(request: Request):
+    req = calendar_pb2.ListEventsBatchRequest()
+    try:
+        req.ParseFromString(await request.body())
+    except DecodeError:
+        return Response(status_code=400, content='Broken post payload')
+
+    time_since = req.since.ToDatetime()
+    time_till = req.till.ToDatetime()
+    if time_till <= time_since:
+        return Response(status_code=400, content='time_till <= time_since')
+
+    users = list(dict.fromkeys(req.users))
+    compact = accepts_compact(request)
+    resp = calendar_pb2.CompactEventsBatchResp() if compact else calendar_pb2.ListEventsBatchResp()
+    events_by_user = {}
+    for user in users:
+        user_events = resp.users.add(user=user)
+        events_by_user[user] = user_events.events
+
+    encoder = CompactEncoder(time_since) if compact else ListEventsEncoder(BATCH_EVENTS_TAG)
+    if users:
+        async with request.app.state.db() as session:
+            async with session.begin():
+                async for event in list_events_for_users(users, session, time_since, time_till, request.app.state.occurrence_index, request.app.state.occurrence_cache):
+                    index = len(encoder)
+                    encoder.add(event)
+                    for user in event.participants:
+                        user_events = events_by_user.get(user)
+                        if user_events is not None and (not user_events or user_events[-1] != index):
+                            user_events.append(index)
+
+    # Events go first, then users
+    if compact:
+        content = wire.message_field(
+            COMPACT_BATCH_EVENTS_FIELD, encoder.encode())
+    else:
+        content = encoder.encode()
+    return Response(status_code=200, content=content + resp.SerializeToString(), media_type=encoder.media_type)
+
+
+@route('/sync_events', 'GET')
+async def sync_events(request: Request):
+    username = request.query_params['user']
+    token = request.query_params.get('token', '')
+    try:
+        since_seq = int(token) if token else 0
+    except ValueError:
+        return Response(status_code=400, content='Broken sync token')
+
+    resp = calendar_pb2.SyncEventsResp()
+    async with request.app.state.db() as session:
+        async with session.begin():
+            # Taken before reading, so that writes committing in between are synced next time
+            resp.sync_token = str(await session.scalar(queries.select_sync_token()))
+            for row in await session.execute(queries.select_changes(username, since_seq)):
+                elem = resp.events.add(
+                    id=str(row.id), user=row.author, repitition_rule=row.repitition_rule.to_proto(),
+                    repitition_interval=row.repitition_interval, repitition_count=row.repitition_count or 0,
+                    repitition_weekdays=recurrence.mask_weekdays(row.repitition_weekdays))
+                elem.start_time.FromDatetime(row.start_time)
+                elem.end_time.FromDatetime(row.end_time)
+                if row.repitition_until is not None:
+                    elem.repitition_until.FromDatetime(row.repitition_until)
+                elem.participants.extend(row.participants)
 
     return Response(status_code=200, content=resp.SerializeToString())
 
@@ -285,38 +870,26 @@ async def find_the_gap(request: Request):
 
     async with db() as session:
         async with session.begin():
-            events = [event async for event in list_events_for_users(req.users, session, req.since.ToDatetime(), req.since.ToDatetime() + datetime.timedelta(days=7))]
-
-    event_starts = [event.start_time for event in events]
-    event_ends = [event.end_time for event in events]
-
-    event_starts.sort()
-    event_ends.sort()
+            events = [event async for event in list_events_for_users(req.users, session, req.since.ToDatetime(), req.since.ToDatetime() + datetime.timedelta(days=7), request.app.state.occurrence_index, request.app.state.occurrence_cache)]
+
+    start_time = np.fromiter((event.start_time for event in events), dtype=np.int64, count=len(events)).astype('datetime64[us]')
+    end_time = np.fromiter((event.end_time for event in events), dtype=np.int64, count=len(events)).astype('datetime64[us]')
+    events_by_user = {user: [] for user in req.users}
+    for i, event in enumerate(events):
+        for user in set(event.participants):
+            if user in events_by_user:
+                events_by_user[user].append(i)
+
+    since = req.since.ToDatetime()
+    busy = freebusy.group_bitmap([
+        freebusy.busy_bitmap(start_time[user_events], end_time[user_events], since)
+        for user_events in events_by_user.values()
+    ])
+    slot = freebusy.find_free_slot(busy, duration)
+    if slot is None:
+        return Response(status_code=404)
 
     resp = calendar_pb2.FindTheGapResponse()
-    if len(event_ends) == 0:
-        resp.start_time.CopyFrom(req.since)
-        resp.end_time.FromDatetime(req.since.ToDatetime() + duration)
-        return Response(status_code=200, content=resp.SerializeToString())
-
-    i, j = 0, 0
-    active_events = 0
-    while j < len(event_ends):
-        if i < len(event_starts) and event_starts[i] <= event_ends[j]:
-            i += 1
-            active_events += 1
-            continue
-        active_events -= 1
-        start_time = event_ends[j]
-        if event_ends[j] > req.since.ToDatetime() + datetime.timedelta(days=7):
-            return Response(status_code=404)
-        if active_events == 0 and i < len(event_starts) and start_time + duration <= event_starts[i]:
-            resp.start_time.FromDatetime(event_ends[j])
-            resp.end_time.FromDatetime(event_ends[j] + duration)
-            return Response(status_code=200, content=resp.SerializeToString())
-        j += 1
-    if event_ends[-1] + duration <= req.since.ToDatetime() + datetime.timedelta(weeks=1):
-        resp.start_time.FromDatetime(event_ends[-1])
-        resp.end_time.FromDatetime(event_ends[-1] + duration)
-        return Response(status_code=200, content=resp.SerializeToString())
-    return Response(status_code=404)  # kek
+    resp.start_time.FromDatetime(freebusy.slot_start(since, slot))
+    resp.end_time.FromDatetime(freebusy.slot_start(since, slot) + duration)
+    return Response(status_code=200, content=resp.SerializeToString())
@@ -0,0 +1,100 @@
+import contextvars
+import logging
+import time
+import typing as tp
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStats:
+    def __init__(self):
+        self.queries = 0
+        self.time = 0.0
+        self.rows = 0
+
+
+# Stats of the request being handled, set by the route wrapper
+CURRENT_STATS: contextvars.ContextVar[tp.Optional[QueryStats]] = contextvars.ContextVar(
+    'query_stats', default=None)
+
+
+def count_rows(rows: int):
+    # Streamed results are fetched after the statement is executed, so their
+    # consumers count the rows themselves
+    stats = CURRENT_STATS.get()
+    if stats is not None:
+        stats.rows += rows
+
+
+def timing_headers(stats: QueryStats, total: float) -> tp.Dict[str, str]:
+    return {
+        'Server-Timing': f'db;dur={stats.time * 1000:.3f}, total;dur={total * 1000:.3f}',
+        'X-DB-Queries': str(stats.queries),
+        'X-DB-Rows': str(stats.rows),
+    }
+
+
+def _fetched_rows(cursor) -> int:
+    if cursor.rowcount >= 0:
+        return cursor.rowcount
+    # asyncpg adapter reports -1 for SELECT, but keeps the buffered rows on the cursor
+    rows = getattr(cursor, '_rows', None)
+    return len(rows) if rows is not None else 0
+
+
+def _record(elapsed: float, rows: int):
+    stats = CURRENT_STATS.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.time += elapsed
+        stats.rows += rows
+
+
+class QueryInstrumentation:
+    def __init__(self, slow_query_threshold: tp.Optional[float] = None, explain: bool = False):
+        self.slow_query_threshold = slow_query_threshold
+        self.explain = explain
+
+    def install(self, engine: Engine):
+        event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+        event.listen(engine, 'handle_error', self._handle_error)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        # Kept on the execution context, so that nothing outlives a failed statement
+        context._query_started = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._query_started
+        rows = _fetched_rows(cursor)
+        _record(elapsed, rows)
+
+        if self.slow_query_threshold is None or elapsed < self.slow_query_threshold:
+            return
+        plan = None
+        if self.explain and not executemany and statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+            plan = self._explain(conn, statement, parameters)
+        logger.warning('Slow query (%.1f ms, %d rows): %s\nParameters: %r%s', elapsed * 1000, rows,
+                       statement, parameters, '' if plan is None else '\nPlan:\n' + plan)
+
+    def _handle_error(self, exception_context):
+        # Failed statements count as queries, but don't get to the slow query log
+        started = getattr(exception_context.execution_context, '_query_started', None)
+        if started is not None:
+            _record(time.perf_counter() - started, 0)
+
+    def _explain(self, conn, statement, parameters) -> tp.Optional[str]:
+        # Raw DBAPI cursor, so that EXPLAIN itself isn't instrumented
+        cursor = conn.connection.cursor()
+        try:
+            cursor.execute('EXPLAIN ' + statement, parameters)
+            return '\n'.join(row[0] for row in cursor.fetchall())
+        except Exception:
+            logger.exception('Failed to explain slow query')
+            return None
+        finally:
+            cursor.close()
@@ -1,3 +1,5 @@
+import asyncio
+import datetime
 import databases
 import os
 from starlette.applications import Starlette
@@ -5,7 +7,11 @@ from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from src.routing import ROUTE_TABLE
 
-from src import datamodel
+from src import schema
+from src.instrumentation import QueryInstrumentation
+from src.profiling import Profiler
+from src.cache import OccurrenceCache, ResponseCache
+from src.occurrences import OccurrenceIndex
 import src.handles
 
 
@@ -13,16 +19,104 @@ def get_postgres_url():
     return os.environ['DATABASE_URL']
 
 
+def get_occurrence_index_horizon():
+    days = os.environ.get('OCCURRENCE_INDEX_HORIZON_DAYS')
+    if not days:
+        return None
+    return datetime.timedelta(days=int(days))
+
+
+def get_occurrence_cache():
+    max_bytes = os.environ.get('OCCURRENCE_CACHE_MAX_BYTES')
+    if not max_bytes:
+        return None
+    ttl = datetime.timedelta(seconds=int(
+        os.environ.get('OCCURRENCE_CACHE_TTL_SECONDS', '60')))
+    return OccurrenceCache(int(max_bytes), ttl)
+
+
+def get_response_cache():
+    max_bytes = os.environ.get('RESPONSE_CACHE_MAX_BYTES')
+    if not max_bytes:
+        return None
+    ttl = datetime.timedelta(seconds=int(
+        os.environ.get('RESPONSE_CACHE_TTL_SECONDS', '60')))
+    return ResponseCache(int(max_bytes), ttl)
+
+
+def get_schema_mode():
+    # `sync` keeps the data and applies missing DDL, `recreate` starts from an empty database
+    return os.environ.get('DATABASE_SCHEMA_MODE', 'sync')
+
+
+# A listing holds its session's connection and up to MAX_QUERY_FANOUT more
+DEFAULT_POOL_SIZE = 5 * (1 + src.handles.MAX_QUERY_FANOUT)
+DEFAULT_POOL_OVERFLOW = 2 * DEFAULT_POOL_SIZE
+
+
+def get_pool_warmup():
+    return int(os.environ.get('DATABASE_POOL_WARMUP', '0'))
+
+
+def get_profiler():
+    # Profiles land in PROFILE_DIR; requests are picked by PROFILE_SAMPLE_RATE or by
+    # the X-Profile: 1 header from hosts listed in PROFILE_ALLOWED_CALLERS. A profile
+    # covers everything the worker runs meanwhile, see Profiler
+    directory = os.environ.get('PROFILE_DIR')
+    if not directory:
+        return None
+    allowed_callers = [caller.strip() for caller in os.environ.get(
+        'PROFILE_ALLOWED_CALLERS', '').split(',') if caller.strip()]
+    return Profiler(directory, float(os.environ.get('PROFILE_SAMPLE_RATE', '0')), allowed_callers)
+
+
+def get_query_instrumentation():
+    # Statements slower than SLOW_QUERY_MS are logged, with their plan if SLOW_QUERY_EXPLAIN is set
+    threshold = os.environ.get('SLOW_QUERY_MS')
+    return QueryInstrumentation(
+        slow_query_threshold=None if not threshold else int(
+            threshold) / 1000,
+        explain=os.environ.get('SLOW_QUERY_EXPLAIN', '0') != '0')
+
+
 async def init_db():
     database_url = get_postgres_url()
-    db = create_async_engine(database_url)
-    async with db.begin() as conn:
-        await conn.run_sync(datamodel.Base.metadata.drop_all)
-        await conn.run_sync(datamodel.Base.metadata.create_all)
+    pool_warmup = get_pool_warmup()
+    db = create_async_engine(database_url, pool_size=max(
+        DEFAULT_POOL_SIZE, pool_warmup), max_overflow=DEFAULT_POOL_OVERFLOW)
+    get_query_instrumentation().install(db.sync_engine)
+    if get_schema_mode() == 'recreate':
+        await schema.recreate_schema(db)
+    else:
+        await schema.sync_schema(db)
+    if pool_warmup > 0:
+        await schema.warm_up_pool(db, pool_warmup)
+    app.state.engine = db
     app.state.db = sessionmaker(
         db, expire_on_commit=False, class_=AsyncSession)
 
+    app.state.profiler = get_profiler()
+
+    app.state.occurrence_cache = get_occurrence_cache()
+
+    app.state.response_cache = get_response_cache()
+
+    app.state.occurrence_index = None
+    app.state.background_tasks = []
+    horizon = get_occurrence_index_horizon()
+    if horizon is not None:
+        app.state.occurrence_index = OccurrenceIndex(horizon)
+        await app.state.occurrence_index.extend(app.state.db)
+        app.state.background_tasks.append(asyncio.create_task(
+            app.state.occurrence_index.run(app.state.db)))
+
+
+async def stop_background_tasks():
+    for task in app.state.background_tasks:
+        task.cancel()
+
 app = Starlette(
     routes=ROUTE_TABLE,
-    on_startup=[init_db]
+    on_startup=[init_db],
+    on_shutdown=[stop_background_tasks]
 )
@@ -0,0 +1,96 @@
+import bisect
+import collections
+import typing as tp
+
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class RouteMetrics:
+    def __init__(self):
+        self.requests: tp.Dict[int, int] = collections.defaultdict(int)
+        self.in_flight = 0
+        # Non-cumulative, the last one counts requests slower than every bucket
+        self.latency_buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+
+    def observe(self, status_code: int, latency: float):
+        self.requests[status_code] += 1
+        self.latency_buckets[bisect.bisect_left(
+            LATENCY_BUCKETS, latency)] += 1
+        self.latency_sum += latency
+
+
+ROUTE_METRICS: tp.Dict[str, RouteMetrics] = {}
+
+
+def route_metrics(path: str) -> RouteMetrics:
+    return ROUTE_METRICS.setdefault(path, RouteMetrics())
+
+
+def _labels(**labels) -> str:
+    return '{' + ','.join(f'{name}="{value}"' for name, value in labels.items()) + '}'
+
+
+class Exposition:
+    # Prometheus text exposition format
+    def __init__(self):
+        self.lines: tp.List[str] = []
+
+    def metric(self, name: str, kind: str, help: str):
+        self.lines.append(f'# HELP {name} {help}')
+        self.lines.append(f'# TYPE {name} {kind}')
+
+    def sample(self, name: str, value, **labels):
+        self.lines.append(
+            f'{name}{_labels(**labels) if labels else ""} {value}')
+
+    def render(self) -> str:
+        return ''.join(line + '\n' for line in self.lines)
+
+
+def render_routes(exposition: Exposition):
+    exposition.metric('calendar_requests_total', 'counter',
+                      'Handled requests by route and status code')
+    for path, metrics in ROUTE_METRICS.items():
+        for status_code, count in sorted(metrics.requests.items()):
+            exposition.sample('calendar_requests_total',
+                              count, route=path, status=status_code)
+
+    exposition.metric('calendar_requests_in_flight', 'gauge',
+                      'Requests being handled right now')
+    for path, metrics in ROUTE_METRICS.items():
+        exposition.sample('calendar_requests_in_flight',
+                          metrics.in_flight, route=path)
+
+    exposition.metric('calendar_request_duration_seconds', 'histogram',
+                      'Time spent in the handler')
+    for path, metrics in ROUTE_METRICS.items():
+        total = 0
+        for bound, count in zip(LATENCY_BUCKETS, metrics.latency_buckets):
+            total += count
+            exposition.sample('calendar_request_duration_seconds_bucket',
+                              total, route=path, le=bound)
+        total += metrics.latency_buckets[-1]
+        exposition.sample('calendar_request_duration_seconds_bucket',
+                          total, route=path, le='+Inf')
+        exposition.sample('calendar_request_duration_seconds_sum',
+                          metrics.latency_sum, route=path)
+        exposition.sample('calendar_request_duration_seconds_count',
+                          total, route=path)
+
+
+def render_pool(exposition: Exposition, pool):
+    stats = [
+        ('calendar_db_pool_size', 'Configured size of the connection pool', pool.size()),
+        ('calendar_db_pool_checked_out',
+         'Connections currently in use', pool.checkedout()),
+        ('calendar_db_pool_checked_in',
+         'Idle connections kept in the pool', pool.checkedin()),
+        ('calendar_db_pool_overflow',
+         'Connections opened above the pool size', pool.overflow()),
+    ]
+    for name, help, value in stats:
+        exposition.metric(name, 'gauge', help)
+        exposition.sample(name, value)
@@ -0,0 +1,100 @@
+import asyncio
+import datetime
+import logging
+import typing as tp
+
+from sqlalchemy import select, insert, and_
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from src import datamodel, queries, recurrence
+
+
+EXTEND_PERIOD = datetime.timedelta(hours=1)
+BATCH_SIZE = 1000
+HORIZON_ID = 1
+
+logger = logging.getLogger(__name__)
+
+
+async def materialize(session: AsyncSession, events: tp.Sequence[datamodel.Event], participants: tp.Sequence[tp.Collection[str]], time_since: datetime.datetime, time_till: datetime.datetime):
+    occurrences = recurrence.expand_series(events, time_since, time_till)
+    rows = []
+    for series, start_time, end_time in zip(occurrences.series.tolist(), occurrences.start_time.tolist(), occurrences.end_time.tolist()):
+        for user in participants[series]:
+            rows.append(dict(user=user, event_id=events[series].id,
+                        start_time=start_time, end_time=end_time))
+    if rows:
+        await session.execute(insert(datamodel.Occurrence), rows)
+
+
+def select_occurrences(users: tp.List[str], time_since: datetime.datetime, time_till: datetime.datetime):
+    # Occurrences are stored per participant, distinct collapses the ones shared by several users
+    return (select(datamodel.Event.id, datamodel.Event.author, datamodel.Occurrence.start_time, datamodel.Occurrence.end_time,
+                   queries.participants_of(datamodel.Event.id).label('participants'))
+            .join(datamodel.Occurrence, datamodel.Event.id == datamodel.Occurrence.event_id)
+            .where(and_(
+                datamodel.Occurrence.user.in_(users),
+                datamodel.Occurrence.start_time >= time_since,
+                datamodel.Occurrence.start_time < time_till,
+            ))
+            .distinct()
+            .order_by(datamodel.Occurrence.start_time))
+
+
+class OccurrenceIndex:
+    def __init__(self, horizon: datetime.timedelta):
+        self.horizon = horizon
+        # Horizon as last seen by this process. It only grows, so a stale value is safe to read from
+        self.since: tp.Optional[datetime.datetime] = None
+        self.till: tp.Optional[datetime.datetime] = None
+
+    def covers(self, time_since: datetime.datetime, time_till: datetime.datetime) -> bool:
+        return self.since is not None and self.since <= time_since and time_till < self.till
+
+    async def add_events(self, session: AsyncSession, events: tp.Sequence[datamodel.Event], participants: tp.Sequence[tp.Collection[str]]):
+        # Shared lock keeps the horizon from moving until the new events are committed
+        horizon = await session.scalar(
+            select(datamodel.OccurrenceHorizon).with_for_update(read=True))
+        if horizon is not None:
+            await materialize(session, events, participants, horizon.since, horizon.till)
+
+    async def extend(self, db):
+        today = datetime.datetime.combine(
+            datetime.datetime.utcnow().date(), datetime.time())
+        async with db() as session:
+            async with session.begin():
+                await session.execute(
+                    postgresql.insert(datamodel.OccurrenceHorizon)
+                    .values(id=HORIZON_ID, since=today, till=today)
+                    .on_conflict_do_nothing()
+                )
+                horizon = await session.scalar(
+                    select(datamodel.OccurrenceHorizon).with_for_update())
+                if horizon.till < today + self.horizon:
+                    await self._materialize_all(session, horizon.till, today + self.horizon)
+                    horizon.till = today + self.horizon
+            await session.commit()
+        self.since, self.till = horizon.since, horizon.till
+
+    async def _materialize_all(self, session: AsyncSession, time_since: datetime.datetime, time_till: datetime.datetime):
+        query = (select(datamodel.Event)
+                 .where(queries.active_between(time_since, time_till))
+                 .order_by(datamodel.Event.id)
+                 .limit(BATCH_SIZE)
+                 .options(selectinload(datamodel.Event.participants)))
+        events = (await session.scalars(query)).all()
+        while events:
+            participants = [{participant.user for participant in event.participants}
+                            for event in events]
+            await materialize(session, events, participants, time_since, time_till)
+            events = (await session.scalars(query.where(datamodel.Event.id > events[-1].id))).all()
+
+    async def run(self, db):
+        while True:
+            await asyncio.sleep(EXTEND_PERIOD.total_seconds())
+            try:
+                await self.extend(db)
+            except Exception:
+                logger.exception('Failed to extend occurrence index')
@@ -0,0 +1,54 @@
+import asyncio
+import cProfile
+import datetime
+import os
+import random
+import time
+import typing as tp
+
+from starlette.requests import Request
+
+
+PROFILE_HEADER = 'X-Profile'
+
+
+class Profiler:
+    # Profiles whole requests with cProfile on a wall clock. cProfile sees the whole
+    # thread, not the task: whatever else the event loop runs meanwhile, concurrent
+    # requests included, lands in the same profile, and time spent awaiting is
+    # charged to the loop's poll rather than to the awaiting call site. Only one
+    # request is profiled at a time, so profiles are best taken on an idle worker
+    def __init__(self, directory: str, sample_rate: float = 0.0, allowed_callers: tp.Collection[str] = ()):
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.allowed_callers = set(allowed_callers)
+        self._active = False
+
+    def wants(self, request: Request) -> bool:
+        if self._active:
+            return False
+        if request.headers.get(PROFILE_HEADER) == '1' and request.client is not None \
+                and request.client.host in self.allowed_callers:
+            return True
+        return random.random() < self.sample_rate
+
+    async def profile(self, path: str, call: tp.Callable[[], tp.Awaitable]):
+        profile = cProfile.Profile(time.perf_counter)
+        self._active = True
+        started = datetime.datetime.utcnow()
+        profile.enable()
+        try:
+            response = await call()
+        finally:
+            profile.disable()
+            self._active = False
+        name = '{}-{}.prof'.format(started.strftime('%Y%m%dT%H%M%S.%f'),
+                                   path.strip('/').replace('/', '_') or 'root')
+        # Marshalling and writing the stats would block the loop
+        await asyncio.get_running_loop().run_in_executor(None, self._dump, profile, name)
+        response.headers[PROFILE_HEADER] = name
+        return response
+
+    def _dump(self, profile: cProfile.Profile, name: str):
+        os.makedirs(self.directory, exist_ok=True)
+        profile.dump_stats(os.path.join(self.directory, name))
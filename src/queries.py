@@ -0,0 +1,72 @@
+import typing as tp
+
+from sqlalchemy import select, update, func, and_, or_, text
+
+from src import datamodel
+
+
+def participants_of(event_id):
+    return (select(func.array_agg(datamodel.UserEvent.user))
+            .where(datamodel.UserEvent.event_id == event_id)
+            .correlate_except(datamodel.UserEvent)
+            .scalar_subquery())
+
+
+def select_series(users):
+    # Every event once, however many of the users take part in it, with all of
+    # its participants aggregated in the same query
+    return (select(
+        datamodel.Event.id,
+        datamodel.Event.author,
+        datamodel.Event.start_time,
+        datamodel.Event.end_time,
+        datamodel.Event.repitition_rule,
+        datamodel.Event.repitition_interval,
+        datamodel.Event.repitition_weekdays,
+        datamodel.Event.last_start_time,
+        participants_of(datamodel.Event.id).label('participants'),
+    ).where(datamodel.Event.id.in_(
+        select(datamodel.UserEvent.event_id).where(datamodel.UserEvent.user.in_(users)))))
+
+
+def active_between(time_since, time_till):
+    # Events which may have an occurrence starting in [time_since, time_till)
+    return datamodel.Event.active_span.op('&&')(func.tsrange(time_since, time_till, '[)'))
+
+
+def select_sync_token():
+    # Transactions below snapshot xmin are all committed and visible, so whatever
+    # is written later gets a change_seq not below it
+    return select(text('pg_snapshot_xmin(pg_current_snapshot())::text::bigint'))
+
+
+def select_changes(user: str, since_seq: int):
+    # Events of the user written, or which the user was added to, since the sync token
+    return (select(
+        datamodel.Event.id,
+        datamodel.Event.author,
+        datamodel.Event.start_time,
+        datamodel.Event.end_time,
+        datamodel.Event.repitition_rule,
+        datamodel.Event.repitition_interval,
+        datamodel.Event.repitition_count,
+        datamodel.Event.repitition_until,
+        datamodel.Event.repitition_weekdays,
+        participants_of(datamodel.Event.id).label('participants'),
+    ).join(datamodel.UserEvent, and_(
+        datamodel.UserEvent.event_id == datamodel.Event.id,
+        datamodel.UserEvent.user == user,
+    )).where(or_(
+        datamodel.Event.change_seq >= since_seq,
+        datamodel.UserEvent.change_seq >= since_seq,
+    )).distinct())
+
+
+def select_user_version(user: str):
+    return select(datamodel.User.version).where(datamodel.User.login == user)
+
+
+def bump_user_versions(users: tp.Collection[str]):
+    return (update(datamodel.User)
+            .where(datamodel.User.login.in_(users))
+            .values(version=datamodel.User.version + 1))
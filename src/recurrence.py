@@ -0,0 +1,298 @@
+import datetime
+import math
+import typing as tp
+from dataclasses import dataclass
+
+import numpy as np
+
+from src import datamodel
+
+
+DAY = np.timedelta64(1, 'D')
+WEEK = np.timedelta64(7, 'D')
+
+
+@dataclass
+class Occurrences:
+    # Index of the series (row in the expanded batch) every occurrence belongs to
+    series: np.ndarray
+    start_time: np.ndarray
+    end_time: np.ndarray
+
+    def __len__(self):
+        return len(self.series)
+
+
+def _to_datetime64(value: datetime.datetime) -> np.datetime64:
+    return np.datetime64(value, 'us')
+
+
+EPOCH = datetime.datetime(1970, 1, 1)
+MICROSECOND = datetime.timedelta(microseconds=1)
+
+
+def to_epoch_us(value: datetime.datetime) -> int:
+    return (value - EPOCH) // MICROSECOND
+
+
+def _add_months(time: np.ndarray, months: np.ndarray) -> tp.Tuple[np.ndarray, np.ndarray]:
+    # Same as `time + relativedelta(months=months)`, day of month is clipped to the
+    # last day of the resulting month. Second value marks the clipped elements.
+    day = time.astype('datetime64[D]')
+    time_of_day = time - day
+    month = day.astype('datetime64[M]')
+    day_of_month = (day - month.astype('datetime64[D]')).astype(np.int64)
+
+    result_month = month + months.astype('timedelta64[M]')
+    result_month_start = result_month.astype('datetime64[D]')
+    days_in_month = ((result_month + 1).astype('datetime64[D]') -
+                     result_month_start).astype(np.int64)
+
+    clipped = day_of_month >= days_in_month
+    result_day = result_month_start + \
+        np.minimum(day_of_month, days_in_month - 1) * DAY
+    return result_day + time_of_day, clipped
+
+
+def _repeat(counts: np.ndarray) -> tp.Tuple[np.ndarray, np.ndarray]:
+    # For every element `i` repeated `counts[i]` times returns its position and
+    # the number of the repetition
+    counts = np.maximum(counts, 0)
+    position = np.repeat(np.arange(len(counts)), counts)
+    offsets = np.cumsum(counts) - counts
+    return position, np.arange(len(position)) - np.repeat(offsets, counts)
+
+
+# Series without an end run till the end of representable time
+NEVER = np.datetime64('9999-12-31T00:00:00', 'us')
+# Longer intervals can't repeat within representable time, and a step of that
+# many weeks still fits into int64 microseconds
+MAX_INTERVAL = int((NEVER - np.datetime64('0001-01-01', 'us')) // DAY)
+# Gregorian calendar repeats itself every 400 years
+CALENDAR_CYCLE_MONTHS = 400 * 12
+
+
+@dataclass
+class Series:
+    rule: np.ndarray
+    start_time: np.ndarray
+    end_time: np.ndarray
+    # Every `interval`-th day/week/month/year of the rule repeats
+    interval: np.ndarray
+    # Bitmask of the days of week weekly series repeat on, Monday is the lowest bit.
+    # Empty mask repeats on the day of start_time
+    weekdays: np.ndarray
+    # No occurrence starts later
+    last_start_time: np.ndarray
+
+    def __len__(self):
+        return len(self.start_time)
+
+    def __getitem__(self, idx) -> 'Series':
+        return Series(self.rule[idx], self.start_time[idx], self.end_time[idx], self.interval[idx], self.weekdays[idx], self.last_start_time[idx])
+
+
+def _ceil_div(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return -(-a // b)
+
+
+def _weekday(day: np.ndarray) -> np.ndarray:
+    # 1970-01-01 is Thursday
+    return (day.astype(np.int64) + 3) % 7
+
+
+# Every expander returns the series and the start of their occurrences, at least
+# all of the ones starting in [since, till) and not after the end of the series.
+# Work is bounded by the amount of occurrences in the window, not by the age of the series
+
+def _expand_none(series: Series, since: np.datetime64, till: np.datetime64):
+    return np.arange(len(series)), series.start_time
+
+
+def _expand_by_step(series: Series, since: np.datetime64, till: np.datetime64, unit: np.timedelta64):
+    start_time = series.start_time.astype(np.int64)
+    step = series.interval * unit.astype('timedelta64[us]').astype(np.int64)
+    first = np.maximum(_ceil_div(since.astype(np.int64) - start_time, step), 0)
+    last = np.minimum(_ceil_div(till.astype(np.int64) - start_time, step),
+                      (series.last_start_time.astype(np.int64) - start_time) // step + 1)
+
+    position, i = _repeat(last - first)
+    return position, series.start_time[position] + ((first[position] + i) * step[position]).astype('timedelta64[us]')
+
+
+def _expand_by_weekdays(series: Series, since: np.datetime64, till: np.datetime64):
+    # Occurrences are `period * n + weekday` days after Monday of the first week
+    day = series.start_time.astype('datetime64[D]')
+    monday = day - _weekday(day) * DAY
+    base = (monday.astype('datetime64[us]') + (series.start_time - day)).astype(np.int64)
+    day_us = DAY.astype('timedelta64[us]').astype(np.int64)
+    period = series.interval * 7
+
+    first_day = np.maximum(_ceil_div(since.astype(np.int64) - base, day_us), _weekday(day))
+    last_day = np.minimum(_ceil_div(till.astype(np.int64) - base, day_us),
+                          (series.last_start_time.astype(np.int64) - base) // day_us + 1)
+    first = first_day // period
+    last = np.where(last_day > first_day, (last_day - 1) // period + 1, first)
+
+    position, i = _repeat(last - first)
+    position, weekday = np.repeat(position, 7), np.tile(np.arange(7), len(position))
+    days = (first[position] + np.repeat(i, 7)) * period[position] + weekday
+    mask = ((series.weekdays[position] >> weekday) & 1).astype(bool) & \
+        (days >= first_day[position]) & (days < last_day[position])
+    position, days = position[mask], days[mask]
+    return position, (base[position] + days * day_us).astype('datetime64[us]')
+
+
+def _expand_daily(series: Series, since: np.datetime64, till: np.datetime64):
+    return _expand_by_step(series, since, till, DAY)
+
+
+def _expand_weekly(series: Series, since: np.datetime64, till: np.datetime64):
+    by_weekdays = np.flatnonzero(series.weekdays != 0)
+    by_step = np.flatnonzero(series.weekdays == 0)
+    position, start_time = _expand_by_step(series[by_step], since, till, WEEK)
+    weekdays_position, weekdays_start_time = _expand_by_weekdays(series[by_weekdays], since, till)
+    return np.concatenate((by_step[position], by_weekdays[weekdays_position])), np.concatenate((start_time, weekdays_start_time))
+
+
+def _expand_by_months(series: Series, since: np.datetime64, till: np.datetime64, months: int):
+    start_month = series.start_time.astype('datetime64[M]')
+    step = series.interval * months
+    first = np.maximum((since.astype('datetime64[M]') - start_month).astype(np.int64) // step, 0)
+    last = np.minimum((till.astype('datetime64[M]') - start_month).astype(np.int64),
+                      (series.last_start_time.astype('datetime64[M]') - start_month).astype(np.int64)) // step
+
+    position, i = _repeat(last + 1 - first)
+    occurrence_start, clipped = _add_months(series.start_time[position], (first[position] + i) * step[position])
+    if months != 1:
+        # Yearly occurrence stays in the same month, so clipped February 29th is kept
+        return position, occurrence_start
+    # Months without the day of month are skipped
+    return position[~clipped], occurrence_start[~clipped]
+
+
+def _expand_monthly(series: Series, since: np.datetime64, till: np.datetime64):
+    return _expand_by_months(series, since, till, months=1)
+
+
+def _expand_yearly(series: Series, since: np.datetime64, till: np.datetime64):
+    return _expand_by_months(series, since, till, months=12)
+
+
+SERIES_EXPANDERS = {
+    datamodel.RepititionRule.NONE: _expand_none,
+    datamodel.RepititionRule.DAILY: _expand_daily,
+    datamodel.RepititionRule.WEEKLY: _expand_weekly,
+    datamodel.RepititionRule.MONTHLY: _expand_monthly,
+    datamodel.RepititionRule.YEARLY: _expand_yearly,
+}
+
+
+def to_series(rows: tp.Sequence[datamodel.Event]) -> Series:
+    # Rows of events not flushed yet have None in the columns with server defaults
+    return Series(
+        rule=np.array([row.repitition_rule.value for row in rows], dtype=np.int64),
+        start_time=np.array([row.start_time for row in rows], dtype='datetime64[us]'),
+        end_time=np.array([row.end_time for row in rows], dtype='datetime64[us]'),
+        interval=np.array([row.repitition_interval or 1 for row in rows], dtype=np.int64),
+        weekdays=np.array([row.repitition_weekdays or 0 for row in rows], dtype=np.int64),
+        last_start_time=np.array([NEVER if row.last_start_time is None else row.last_start_time for row in rows],
+                                 dtype='datetime64[us]'),
+    )
+
+
+def expand(series: Series, time_since: datetime.datetime, time_till: datetime.datetime) -> Occurrences:
+    # Follows every series from its own start time and returns exactly the
+    # occurrences starting in [time_since, time_till)
+    since, till = _to_datetime64(time_since), _to_datetime64(time_till)
+
+    positions, starts = [], []
+    for rule, expander in SERIES_EXPANDERS.items():
+        rows_idx = np.flatnonzero(series.rule == rule.value)
+        if len(rows_idx) == 0:
+            continue
+        position, occurrence_start = expander(series[rows_idx], since, till)
+        positions.append(rows_idx[position])
+        starts.append(occurrence_start)
+
+    if not positions:
+        return Occurrences(
+            series=np.empty(0, dtype=np.int64),
+            start_time=np.empty(0, dtype='datetime64[us]'),
+            end_time=np.empty(0, dtype='datetime64[us]'),
+        )
+
+    position, start_time = np.concatenate(positions), np.concatenate(starts)
+    mask = (start_time >= since) & (start_time < till) & (start_time <= series.last_start_time[position])
+    position, start_time = position[mask], start_time[mask]
+    # Keep occurrences of one series together and in chronological order
+    order = np.lexsort((start_time, position))
+    position, start_time = position[order], start_time[order]
+    return Occurrences(series=position, start_time=start_time,
+                       end_time=start_time + (series.end_time - series.start_time)[position])
+
+
+def expand_series(rows: tp.Sequence[datamodel.Event], time_since: datetime.datetime, time_till: datetime.datetime) -> Occurrences:
+    return expand(to_series(rows), time_since, time_till)
+
+
+def weekdays_mask(weekdays: tp.Iterable[int]) -> int:
+    mask = 0
+    for weekday in weekdays:
+        mask |= 1 << weekday
+    return mask
+
+
+def mask_weekdays(mask: int) -> tp.List[int]:
+    return [weekday for weekday in range(7) if mask >> weekday & 1]
+
+
+def _nth_by_months(start_time: np.datetime64, n: int, step: int, skip_clipped: bool) -> np.datetime64:
+    if not skip_clipped or start_time.astype(datetime.datetime).day <= 28:
+        months = n * step
+    else:
+        # Which steps land on a missing day repeats with the calendar cycle
+        cycle = CALENDAR_CYCLE_MONTHS // math.gcd(step, CALENDAR_CYCLE_MONTHS)
+        _, clipped = _add_months(np.full(cycle, start_time), np.arange(cycle) * step)
+        valid = np.flatnonzero(~clipped)
+        cycles, i = divmod(n, len(valid))
+        months = (cycles * cycle + int(valid[i])) * step
+    if months > (NEVER.astype('datetime64[M]') - start_time.astype('datetime64[M]')).astype(np.int64):
+        return NEVER
+    return _add_months(np.array([start_time]), np.array([months]))[0][0]
+
+
+def _nth_start_time(rule: datamodel.RepititionRule, start_time: datetime.datetime, n: int, interval: int, weekdays: int) -> np.datetime64:
+    # Start of the n-th occurrence counting from zero
+    start = _to_datetime64(start_time)
+    if rule == datamodel.RepititionRule.NONE:
+        return start
+    if rule == datamodel.RepititionRule.MONTHLY:
+        return _nth_by_months(start, n, interval, skip_clipped=True)
+    if rule == datamodel.RepititionRule.YEARLY:
+        return _nth_by_months(start, n, interval * 12, skip_clipped=False)
+
+    days = interval if rule == datamodel.RepititionRule.DAILY else interval * 7
+    if rule == datamodel.RepititionRule.WEEKLY and weekdays:
+        # Days of the first week before the start are not occurrences
+        days_of_week = mask_weekdays(weekdays)
+        n += sum(1 for weekday in days_of_week if weekday < start_time.weekday())
+        periods, i = divmod(n, len(days_of_week))
+        offset = periods * days + days_of_week[i] - start_time.weekday()
+    else:
+        offset = n * days
+    if offset > (NEVER - start) // DAY:
+        return NEVER
+    return start + offset * DAY
+
+
+def last_start_time(rule: datamodel.RepititionRule, start_time: datetime.datetime, interval: int = 1, count: tp.Optional[int] = None, until: tp.Optional[datetime.datetime] = None, weekdays: int = 0) -> tp.Optional[datetime.datetime]:
+    # Latest start of an occurrence of the series, None if it repeats forever
+    last = NEVER
+    if rule == datamodel.RepititionRule.NONE:
+        last = _to_datetime64(start_time)
+    elif count is not None:
+        last = _nth_start_time(rule, start_time, count - 1, interval, weekdays)
+    if until is not None:
+        last = min(last, _to_datetime64(until))
+    return None if last == NEVER else last.astype(datetime.datetime)
@@ -1,16 +1,49 @@
 import typing as tp
 import functools
+import time
+from starlette.requests import Request
+from starlette.responses import StreamingResponse
 from starlette.routing import Route
+from src import instrumentation, metrics
 
 
 ROUTE_TABLE = []
 
 
+def _profiler(args):
+    if args and isinstance(args[0], Request):
+        return getattr(args[0].app.state, 'profiler', None)
+    return None
+
+
 def route(path: str, method: tp.Optional[str] = None):
     def decorator(func, method=None):
+        route_metrics = metrics.route_metrics(path)
+
         @functools.wraps(func)
         async def wrapped(*args, **kwargs):
-            return await func(*args, **kwargs)
+            route_metrics.in_flight += 1
+            started = time.perf_counter()
+            status_code = 500
+            query_stats = instrumentation.QueryStats()
+            token = instrumentation.CURRENT_STATS.set(query_stats)
+            try:
+                profiler = _profiler(args)
+                if profiler is not None and profiler.wants(args[0]):
+                    response = await profiler.profile(path, lambda: func(*args, **kwargs))
+                else:
+                    response = await func(*args, **kwargs)
+                status_code = response.status_code
+                # Body of a streaming response runs its queries after the headers are sent
+                if not isinstance(response, StreamingResponse):
+                    response.headers.update(instrumentation.timing_headers(
+                        query_stats, time.perf_counter() - started))
+                return response
+            finally:
+                instrumentation.CURRENT_STATS.reset(token)
+                route_metrics.in_flight -= 1
+                route_metrics.observe(
+                    status_code, time.perf_counter() - started)
         if method is None:
             method = ['GET', 'POST']
         else:
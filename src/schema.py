@@ -0,0 +1,83 @@
+import asyncio
+import logging
+
+import sqlalchemy
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.schema import CreateColumn
+
+from src import datamodel
+
+
+# Arbitrary key of the advisory lock serializing schema changes between workers
+SCHEMA_LOCK_KEY = 0x63616c656e646172
+SCHEMA_VERSION_ID = 1
+
+logger = logging.getLogger(__name__)
+
+
+def apply_missing_ddl(conn):
+    # Creates tables, columns and indexes present in the models but missing in the
+    # database. Nothing is ever dropped or altered
+    inspector = sqlalchemy.inspect(conn)
+    existing_tables = set(inspector.get_table_names())
+    datamodel.Base.metadata.create_all(conn, checkfirst=True)
+
+    for table in datamodel.Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        columns = {column['name']
+                   for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in columns:
+                logger.info('Adding column %s.%s', table.name, column.name)
+                conn.execute(text(
+                    f'ALTER TABLE {table.name} ADD COLUMN {CreateColumn(column).compile(dialect=conn.dialect)}'))
+        indexes = {index['name']
+                   for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in indexes:
+                logger.info('Creating index %s', index.name)
+                index.create(conn)
+
+
+async def sync_schema(engine: AsyncEngine):
+    async with engine.begin() as conn:
+        await conn.execute(text('SELECT pg_advisory_xact_lock(:key)'), dict(key=SCHEMA_LOCK_KEY))
+        await conn.run_sync(datamodel.SchemaVersion.__table__.create, checkfirst=True)
+        version = await conn.scalar(select(datamodel.SchemaVersion.version))
+        # Workers still running older code during a rollout leave a newer schema alone
+        if version is not None and version >= datamodel.SCHEMA_VERSION:
+            return
+        logger.info('Upgrading schema from version %s to %s',
+                    version, datamodel.SCHEMA_VERSION)
+        await conn.run_sync(apply_missing_ddl)
+        await conn.execute(
+            postgresql.insert(datamodel.SchemaVersion)
+            .values(id=SCHEMA_VERSION_ID, version=datamodel.SCHEMA_VERSION)
+            .on_conflict_do_update(index_elements=[datamodel.SchemaVersion.id], set_=dict(version=datamodel.SCHEMA_VERSION),
+                                   where=datamodel.SchemaVersion.version < datamodel.SCHEMA_VERSION)
+        )
+
+
+async def recreate_schema(engine: AsyncEngine):
+    async with engine.begin() as conn:
+        await conn.run_sync(datamodel.Base.metadata.drop_all)
+        await conn.run_sync(datamodel.Base.metadata.create_all)
+        await conn.execute(sqlalchemy.insert(datamodel.SchemaVersion).values(
+            id=SCHEMA_VERSION_ID, version=datamodel.SCHEMA_VERSION))
+
+
+async def warm_up_pool(engine: AsyncEngine, connections: int):
+    # Holds all the connections at once so that the pool really opens that many
+    async def check(barrier: asyncio.Event, opened: list):
+        async with engine.connect() as conn:
+            await conn.execute(text('SELECT 1'))
+            opened.append(conn)
+            if len(opened) == connections:
+                barrier.set()
+            await barrier.wait()
+
+    barrier, opened = asyncio.Event(), []
+    await asyncio.gather(*(check(barrier, opened) for _ in range(connections)))
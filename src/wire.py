@@ -0,0 +1,92 @@
+import typing as tp
+
+import numpy as np
+
+
+def encode_varint(value: int) -> bytes:
+    result = bytearray()
+    while value > 0x7f:
+        result.append((value & 0x7f) | 0x80)
+        value >>= 7
+    result.append(value)
+    return bytes(result)
+
+
+def decode_varint(data: bytes, pos: int) -> tp.Tuple[int, int]:
+    result, shift = 0, 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7f) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+
+LENGTH_DELIMITED = 2
+MICROSECONDS = 10 ** 6
+
+
+def tag(field_number: int, wire_type: int) -> bytes:
+    return encode_varint(field_number << 3 | wire_type)
+
+
+def message_field(field_number: int, payload: bytes) -> bytes:
+    return tag(field_number, LENGTH_DELIMITED) + delimited(payload)
+
+
+def encode_timestamp(microseconds: int) -> bytes:
+    # google.protobuf.Timestamp as set by FromMicroseconds: seconds = 1, nanos = 2,
+    # zeros omitted, negative seconds are 10 byte two's complement varints
+    seconds, micros = divmod(microseconds, MICROSECONDS)
+    result = b''
+    if seconds:
+        result += b'\x08' + encode_varint(seconds & 0xffffffffffffffff)
+    if micros:
+        result += b'\x10' + encode_varint(micros * 1000)
+    return result
+
+
+def zigzag(values: np.ndarray) -> np.ndarray:
+    # sint64 encoding of int64 values
+    values = values.astype(np.int64)
+    return ((values << 1) ^ (values >> 63)).view(np.uint64)
+
+
+def encode_varints(values: np.ndarray) -> bytes:
+    # Concatenated varints of unsigned values, the payload of a packed repeated field
+    values = values.astype(np.uint64)
+    lengths = np.ones(len(values), dtype=np.int64)
+    rest = values >> np.uint64(7)
+    while rest.any():
+        lengths += rest > 0
+        rest >>= np.uint64(7)
+
+    result = np.empty(int(lengths.sum()), dtype=np.uint8)
+    offsets = np.cumsum(lengths) - lengths
+    for group in range(int(lengths.max(initial=0))):
+        mask = lengths > group
+        byte = (values[mask] >> np.uint64(7 * group)) & np.uint64(0x7f)
+        more = (lengths[mask] > group + 1).astype(np.uint64) << np.uint64(7)
+        result[offsets[mask] + group] = byte | more
+    return result.tobytes()
+
+
+def packed_field(field_number: int, payload: bytes) -> bytes:
+    # Empty repeated fields are omitted, as protobuf does
+    if not payload:
+        return b''
+    return message_field(field_number, payload)
+
+
+def delimited(payload: bytes) -> bytes:
+    # Same framing as protobuf's writeDelimitedTo: varint length, then the message
+    return encode_varint(len(payload)) + payload
+
+
+def iter_delimited(data: bytes) -> tp.Iterator[bytes]:
+    pos = 0
+    while pos < len(data):
+        size, pos = decode_varint(data, pos)
+        yield data[pos:pos + size]
+        pos += size
@@ -0,0 +1,77 @@
+import datetime
+from tests.conftest import Server
+from proto import calendar_pb2
+from proto.calendar_pb2 import RepititionRule
+
+
+COMPACT = {'Accept': 'application/x-protobuf-compact'}
+
+
+def decode(resp: calendar_pb2.CompactEventsResp):
+    since = resp.since.ToDatetime()
+    events = []
+    for series, start_offset, duration in zip(resp.occurrence_series, resp.start_offsets, resp.durations):
+        start_time = since + datetime.timedelta(microseconds=start_offset)
+        events.append((resp.users[resp.series[series].user], start_time, start_time + datetime.timedelta(microseconds=duration),
+                       sorted(resp.users[user] for user in resp.series[series].participants)))
+    return events
+
+
+def plain(events):
+    return [(event.user, event.start_time.ToDatetime(), event.end_time.ToDatetime(), sorted(event.participants))
+            for event in events]
+
+
+def create_events(client: Server):
+    client.create_user('kek')
+    client.create_user('lol')
+    client.create_event('kek', start_time=datetime.datetime(2022, 1, 1, 10), end_time=datetime.datetime(
+        2022, 1, 1, 11, 30), repitition_rule=RepititionRule.DAILY, users=['lol'])
+    client.create_event('lol', start_time=datetime.datetime(2021, 12, 31, 23), end_time=datetime.datetime(
+        2022, 1, 1, 1), repitition_rule=RepititionRule.NONE, users=['kek'])
+    client.create_event('kek', start_time=datetime.datetime(2022, 1, 4, 10), end_time=datetime.datetime(
+        2022, 1, 4, 11), repitition_rule=RepititionRule.NONE)
+
+
+def test_list_events(client: Server):
+    create_events(client)
+    params = {'user': 'kek', 'since': datetime.datetime(
+        2021, 12, 31), 'till': datetime.datetime(2022, 1, 7)}
+
+    resp = client.get('/list_events', params=params, headers=COMPACT)
+    assert resp.headers['Content-Type'] == 'application/x-protobuf-compact'
+    compact = calendar_pb2.CompactEventsResp.FromString(resp.content)
+    assert compact.SerializeToString() == resp.content
+    assert len(compact.series) == 3
+    assert sorted(compact.users) == ['kek', 'lol']
+
+    expected = client.list_events('kek', since=params['since'], till=params['till']).events
+    assert decode(compact) == plain(expected)
+    assert resp.headers['ETag'] != client.get('/list_events', params=params).headers['ETag']
+
+    cursor = ''
+    while True:
+        page = {**params, 'limit': 4, 'cursor': cursor}
+        resp = calendar_pb2.CompactEventsResp.FromString(
+            client.get('/list_events', params=page, headers=COMPACT).content)
+        expected = client.list_events_page('kek', params['since'], params['till'], 4, cursor)
+        assert decode(resp) == plain(expected.events)
+        assert resp.next_cursor == expected.next_cursor
+        if not resp.next_cursor:
+            break
+        cursor = resp.next_cursor
+
+
+def test_batch(client: Server):
+    create_events(client)
+    req = calendar_pb2.ListEventsBatchRequest(users=['kek', 'lol'])
+    req.since.FromDatetime(datetime.datetime(2021, 12, 31))
+    req.till.FromDatetime(datetime.datetime(2022, 1, 7))
+    content = client.post('/list_events_batch', content=req.SerializeToString(), headers=COMPACT).content
+    compact = calendar_pb2.CompactEventsBatchResp.FromString(content)
+    assert compact.SerializeToString() == content
+
+    batch = client.list_events_batch(['kek', 'lol'], since=datetime.datetime(
+        2021, 12, 31), till=datetime.datetime(2022, 1, 7))
+    assert decode(compact.events) == plain(batch.events)
+    assert list(compact.users) == list(batch.users)
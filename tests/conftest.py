@@ -5,6 +5,7 @@ from starlette.testclient import TestClient
 from testcontainers.postgres import PostgresContainer
 from src.main import app
 from proto import calendar_pb2
+from src import wire
 import datetime
 from google.protobuf import timestamp_pb2
 
@@ -24,6 +25,20 @@ def client(postgres):
         yield server
 
 
+@pytest.fixture
+def configured_client(request, postgres, monkeypatch, tmp_path):
+    # Server started with the environment given by indirect parametrization,
+    # {tmp_path} in the values stands for the test's temporary directory
+    for name, value in request.param.items():
+        monkeypatch.setenv(name, value.format(tmp_path=tmp_path))
+    with Server() as server:
+        yield server
+
+
+def with_env(**env):
+    return pytest.mark.parametrize('configured_client', [env], indirect=True)
+
+
 class Server(TestClient):
     def __init__(self):
         super(Server, self).__init__(app)
@@ -45,6 +60,13 @@ class Server(TestClient):
         req = calendar_pb2.User(username=user)
         self.post('/create_user', content=req.SerializeToString())
 
+    def create_users(self, users: tp.List[str]) -> calendar_pb2.CreateUsersResponse:
+        req = calendar_pb2.CreateUsersRequest(usernames=users)
+        resp = calendar_pb2.CreateUsersResponse()
+        resp.ParseFromString(
+            self.post('/create_users', content=req.SerializeToString()).content)
+        return resp
+
     def create_event(self, user: str, start_time: datetime.datetime, end_time: datetime.datetime, repitition_rule: calendar_pb2.RepititionRule, users: tp.Optional[tp.List[str]] = None):
         start_time_proto = timestamp_pb2.Timestamp()
         start_time_proto.FromDatetime(start_time)
@@ -56,12 +78,45 @@ class Server(TestClient):
                                  end_time=end_time_proto, repitition_rule=repitition_rule, participants=users)
         self.post('/create_event', content=req.SerializeToString())
 
+    def create_events(self, events: tp.List[calendar_pb2.Event]) -> calendar_pb2.CreateEventsResponse:
+        req = calendar_pb2.CreateEventsRequest()
+        req.events.extend(events)
+        resp = calendar_pb2.CreateEventsResponse()
+        resp.ParseFromString(
+            self.post('/create_events', content=req.SerializeToString()).content)
+        return resp
+
     def list_events(self, user: str, since: datetime.datetime, till: datetime.datetime) -> calendar_pb2.ListEventsResp:
         resp = calendar_pb2.ListEventsResp()
         resp.ParseFromString(self.get(
             '/list_events', params={'user': user, 'since': since, 'till': till}).content)
         return resp
 
+    def list_events_page(self, user: str, since: datetime.datetime, till: datetime.datetime, limit: int, cursor: str = '') -> calendar_pb2.ListEventsResp:
+        resp = calendar_pb2.ListEventsResp()
+        resp.ParseFromString(self.get('/list_events', params={
+                             'user': user, 'since': since, 'till': till, 'limit': limit, 'cursor': cursor}).content)
+        return resp
+
+    def list_events_stream(self, user: str, since: datetime.datetime, till: datetime.datetime) -> tp.List[calendar_pb2.Event]:
+        resp = self.get('/list_events', params={
+                        'user': user, 'since': since, 'till': till, 'stream': 1})
+        return [calendar_pb2.Event.FromString(frame) for frame in wire.iter_delimited(resp.content)]
+
+    def list_events_batch(self, users: tp.List[str], since: datetime.datetime, till: datetime.datetime) -> calendar_pb2.ListEventsBatchResp:
+        req = calendar_pb2.ListEventsBatchRequest(users=users)
+        req.since.FromDatetime(since)
+        req.till.FromDatetime(till)
+        resp = calendar_pb2.ListEventsBatchResp()
+        resp.ParseFromString(
+            self.post('/list_events_batch', content=req.SerializeToString()).content)
+        return resp
+
+    def sync_events(self, user: str, token: str = '') -> calendar_pb2.SyncEventsResp:
+        resp = calendar_pb2.SyncEventsResp()
+        resp.ParseFromString(self.get('/sync_events', params={'user': user, 'token': token}).content)
+        return resp
+
     def find_the_gap(self, users: tp.List[str], start: datetime.datetime, interval: datetime.timedelta) -> calendar_pb2.FindTheGapResponse:
         req = calendar_pb2.FindTheGapRequest()
         req.users.extend(users)
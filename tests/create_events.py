@@ -0,0 +1,58 @@
+import datetime
+from tests.conftest import Server
+from proto import calendar_pb2
+from proto.calendar_pb2 import RepititionRule
+import pytest
+import httpx
+
+
+def make_event(user: str, start_time: datetime.datetime, end_time: datetime.datetime, repitition_rule: calendar_pb2.RepititionRule, users=()) -> calendar_pb2.Event:
+    event = calendar_pb2.Event(
+        user=user, repitition_rule=repitition_rule, participants=users)
+    event.start_time.FromDatetime(start_time)
+    event.end_time.FromDatetime(end_time)
+    return event
+
+
+def test_create_events(client: Server):
+    client.create_user('kek')
+    client.create_user('lol')
+    resp = client.create_events([
+        make_event('kek', datetime.datetime(2023, 1, 1),
+                   datetime.datetime(2023, 1, 1, 1), RepititionRule.NONE, ['lol']),
+        make_event('lol', datetime.datetime(2023, 1, 2),
+                   datetime.datetime(2023, 1, 2, 1), RepititionRule.DAILY),
+    ])
+    assert [result.ok for result in resp.results] == [True, True]
+
+    events = client.list_events('lol', since=datetime.datetime(
+        2023, 1, 1), till=datetime.datetime(2023, 1, 4))
+    assert len(events.events) == 3
+    events = client.list_events('kek', since=datetime.datetime(
+        2023, 1, 1), till=datetime.datetime(2023, 1, 4))
+    assert len(events.events) == 1
+    assert sorted(events.events[0].participants) == ['kek', 'lol']
+
+
+def test_create_events_partial_failure(client: Server):
+    client.create_user('kek')
+    resp = client.create_events([
+        make_event('kek', datetime.datetime(2023, 1, 1),
+                   datetime.datetime(2023, 1, 1, 1), RepititionRule.NONE, ['lol']),
+        make_event('kek', datetime.datetime(2023, 1, 2),
+                   datetime.datetime(2023, 1, 2, 1), RepititionRule.NONE),
+    ])
+    assert not resp.results[0].ok
+    assert resp.results[0].error == 'Wrong username lol'
+    assert resp.results[1].ok
+
+    events = client.list_events('kek', since=datetime.datetime(
+        2023, 1, 1), till=datetime.datetime(2023, 1, 4))
+    assert len(events.events) == 1
+    assert events.events[0].start_time.ToDatetime() == datetime.datetime(2023, 1, 2)
+
+
+def test_create_events_trash_request(client: Server):
+    with pytest.raises(httpx.HTTPStatusError) as e:
+        client.post('/create_events', content=b'kek')
+    assert e.value.response.status_code == 400
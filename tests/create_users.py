@@ -0,0 +1,25 @@
+from tests.conftest import Server
+import pytest
+import httpx
+
+
+def test_create_users(client: Server):
+    resp = client.create_users(['kek', 'lol'])
+    assert resp.created == ['kek', 'lol']
+    assert resp.existing == []
+
+
+def test_create_users_exists(client: Server):
+    client.create_user('kek')
+    resp = client.create_users(['kek', 'lol', 'lol'])
+    assert resp.created == ['lol']
+    assert resp.existing == ['kek']
+    with pytest.raises(httpx.HTTPStatusError) as e:
+        client.create_user('lol')
+    assert e.value.response.status_code == 409
+
+
+def test_create_users_trash_request(client: Server):
+    with pytest.raises(httpx.HTTPStatusError) as e:
+        client.post('/create_users', content=b'kek')
+    assert e.value.response.status_code == 400
@@ -1,5 +1,6 @@
 import datetime
 from tests.conftest import Server
+from proto import calendar_pb2
 from proto.calendar_pb2 import RepititionRule
 import pytest
 import httpx
@@ -67,3 +68,50 @@ def test_repeated_and_not_repeated(client: Server):
         2023, 1, 15), interval=datetime.timedelta(minutes=30))
     assert resp.start_time.ToDatetime() == datetime.datetime(2023, 1, 16, 23, 30)
     assert resp.end_time.ToDatetime() == datetime.datetime(2023, 1, 17, 0, 0)
+
+
+def test_gap_before_first_event(client: Server):
+    client.create_user('kek')
+    client.create_event('kek', start_time=datetime.datetime(
+        2023, 1, 1, 2), end_time=datetime.datetime(2023, 1, 1, 3), repitition_rule=RepititionRule.NONE)
+    resp = client.find_the_gap(['kek'], datetime.datetime(
+        2023, 1, 1), interval=datetime.timedelta(hours=1))
+    assert resp.start_time.ToDatetime() == datetime.datetime(2023, 1, 1)
+    assert resp.end_time.ToDatetime() == datetime.datetime(2023, 1, 1, 1)
+
+
+def test_group(client: Server):
+    client.create_user('kek')
+    client.create_user('lol')
+    client.create_event('kek', start_time=datetime.datetime(
+        2023, 1, 1), end_time=datetime.datetime(2023, 1, 1, 1), repitition_rule=RepititionRule.NONE)
+    client.create_event('lol', start_time=datetime.datetime(
+        2023, 1, 1, 1), end_time=datetime.datetime(2023, 1, 1, 2), repitition_rule=RepititionRule.NONE)
+    client.create_event('lol', start_time=datetime.datetime(
+        2023, 1, 1, 2, 20), end_time=datetime.datetime(2023, 1, 1, 3), repitition_rule=RepititionRule.NONE)
+    resp = client.find_the_gap(['kek', 'lol'], datetime.datetime(
+        2023, 1, 1), interval=datetime.timedelta(minutes=30))
+    assert resp.start_time.ToDatetime() == datetime.datetime(2023, 1, 1, 3)
+    resp = client.find_the_gap(['kek'], datetime.datetime(
+        2023, 1, 1), interval=datetime.timedelta(minutes=30))
+    assert resp.start_time.ToDatetime() == datetime.datetime(2023, 1, 1, 1)
+
+
+def test_group_shared_event(client: Server):
+    client.create_user('kek')
+    client.create_user('lol')
+    client.create_event('kek', start_time=datetime.datetime(2023, 1, 1), end_time=datetime.datetime(
+        2023, 1, 1, 1), repitition_rule=RepititionRule.DAILY, users=['lol'])
+
+    req = calendar_pb2.FindTheGapRequest(users=['kek', 'lol'])
+    req.since.FromDatetime(datetime.datetime(2023, 1, 1))
+    req.interval.FromTimedelta(datetime.timedelta(minutes=30))
+    resp = client.post('/find_the_gap', content=req.SerializeToString())
+    # The shared series is fetched once, together with its participants, by
+    # one query per repitition rule
+    assert resp.headers['X-DB-Queries'] == '5'
+    assert resp.headers['X-DB-Rows'] == '1'
+
+    gap = calendar_pb2.FindTheGapResponse()
+    gap.ParseFromString(resp.content)
+    assert gap.start_time.ToDatetime() == datetime.datetime(2023, 1, 1, 1)
@@ -0,0 +1,52 @@
+import datetime
+import logging
+from tests.conftest import Server, with_env
+from proto.calendar_pb2 import RepititionRule
+import httpx
+import pytest
+
+
+configured = with_env(SLOW_QUERY_MS='0', SLOW_QUERY_EXPLAIN='1')
+
+
+def test_timing_headers(client: Server):
+    client.create_user('kek')
+    for day in range(3):
+        client.create_event('kek', start_time=datetime.datetime(2022, 1, 1 + day, 10),
+                            end_time=datetime.datetime(2022, 1, 1 + day, 11), repitition_rule=RepititionRule.NONE)
+
+    resp = client.get('/list_events', params={'user': 'kek', 'since': datetime.datetime(
+        2022, 1, 1), 'till': datetime.datetime(2022, 1, 10)})
+    # User version for the ETag and the events, one query per repitition rule
+    assert resp.headers['X-DB-Queries'] == '6'
+    assert resp.headers['X-DB-Rows'] == '4'
+    assert resp.headers['Server-Timing'].startswith('db;dur=')
+
+    resp = client.get('/ping')
+    assert resp.headers['X-DB-Queries'] == '0'
+
+    # Not known before a streamed body is sent
+    resp = client.get('/list_events', params={'user': 'kek', 'since': datetime.datetime(
+        2022, 1, 1), 'till': datetime.datetime(2022, 1, 10), 'stream': 1})
+    assert 'X-DB-Queries' not in resp.headers
+    assert 'Server-Timing' not in resp.headers
+
+
+@configured
+def test_slow_query_log(configured_client: Server, caplog):
+    configured_client.create_user('kek')
+    with caplog.at_level(logging.WARNING, logger='src.instrumentation'):
+        configured_client.get('/list_events', params={'user': 'kek', 'since': datetime.datetime(
+            2022, 1, 1), 'till': datetime.datetime(2022, 1, 10)})
+    messages = [record.getMessage() for record in caplog.records]
+    assert any('FROM events' in message and "'kek'" in message and 'Plan:' in message
+               for message in messages)
+
+
+def test_failed_query(client: Server):
+    client.create_user('kek')
+    for _ in range(3):
+        with pytest.raises(httpx.HTTPStatusError) as e:
+            client.create_user('kek')
+        # The failed INSERT
+        assert e.value.response.headers['X-DB-Queries'] == '1'
@@ -1,5 +1,7 @@
 from tests.conftest import Server
-from proto.calendar_pb2 import RepititionRule
+from proto.calendar_pb2 import Event, ListEventsResp, RepititionRule
+from src import handles, wire
+import asyncio
 import datetime
 import httpx
 import pytest
@@ -140,7 +142,45 @@ def test_repeated_in_the_future(client: Server):
         2023, 1, 25, 1), repitition_rule=RepititionRule.MONTHLY)
     resp = client.list_events('kek', since=datetime.datetime(
         2024, 1, 24), till=datetime.datetime(2024, 2, 24))
-    assert len(resp.events) == 0
+    assert len(resp.events) == 1
+    assert resp.events[0].start_time.ToDatetime() == datetime.datetime(2024, 1, 25)
+
+
+def create_hourly_events(client: Server, starts, repitition_rule):
+    for start_time in starts:
+        client.create_event('kek', start_time=start_time, end_time=start_time +
+                            datetime.timedelta(hours=1), repitition_rule=repitition_rule)
+
+
+def test_weekly_window_over_week_end(client: Server):
+    client.create_user('kek')
+    # Sunday, Monday and Wednesday
+    create_hourly_events(client, [datetime.datetime(2023, 1, 1, 21), datetime.datetime(
+        2023, 1, 2, 9), datetime.datetime(2023, 1, 4, 9)], RepititionRule.WEEKLY)
+    resp = client.list_events('kek', since=datetime.datetime(
+        2023, 1, 8, 20), till=datetime.datetime(2023, 1, 9, 20))
+    assert [event.start_time.ToDatetime() for event in resp.events] == [
+        datetime.datetime(2023, 1, 8, 21), datetime.datetime(2023, 1, 9, 9)]
+
+
+def test_monthly_window_over_month_end(client: Server):
+    client.create_user('kek')
+    create_hourly_events(client, [datetime.datetime(2022, 12, 31, 10), datetime.datetime(
+        2022, 12, 1, 10), datetime.datetime(2022, 12, 15, 10)], RepititionRule.MONTHLY)
+    resp = client.list_events('kek', since=datetime.datetime(
+        2023, 1, 30), till=datetime.datetime(2023, 2, 2))
+    assert [event.start_time.ToDatetime() for event in resp.events] == [
+        datetime.datetime(2023, 1, 31, 10), datetime.datetime(2023, 2, 1, 10)]
+
+
+def test_yearly_window_over_year_end(client: Server):
+    client.create_user('kek')
+    create_hourly_events(client, [datetime.datetime(2020, 12, 31, 10), datetime.datetime(
+        2021, 1, 2, 10), datetime.datetime(2021, 6, 1, 10)], RepititionRule.YEARLY)
+    resp = client.list_events('kek', since=datetime.datetime(
+        2022, 12, 30), till=datetime.datetime(2023, 1, 3))
+    assert [event.start_time.ToDatetime() for event in resp.events] == [
+        datetime.datetime(2022, 12, 31, 10), datetime.datetime(2023, 1, 2, 10)]
 
 
 def test_list_events_wrong_args(client: Server):
@@ -180,3 +220,100 @@ def test_yearly(client: Server):
     assert event.start_time.ToDatetime() == datetime.datetime(2024, 1, 1)
     assert event.end_time.ToDatetime() == datetime.datetime(2024, 1, 1, 1)
     assert event.participants == ['kek']
+
+
+def test_mixed_repitition_rules(client: Server):
+    client.create_user('kek')
+    client.create_event('kek', start_time=datetime.datetime(2023, 1, 1, 10), end_time=datetime.datetime(
+        2023, 1, 1, 11), repitition_rule=RepititionRule.DAILY)
+    client.create_event('kek', start_time=datetime.datetime(2023, 1, 2, 12), end_time=datetime.datetime(
+        2023, 1, 2, 13), repitition_rule=RepititionRule.WEEKLY)
+    client.create_event('kek', start_time=datetime.datetime(2023, 1, 3, 14), end_time=datetime.datetime(
+        2023, 1, 3, 15), repitition_rule=RepititionRule.NONE)
+    resp = client.list_events('kek', since=datetime.datetime(
+        2023, 1, 1), till=datetime.datetime(2023, 1, 15))
+    # Ordered by start time across repitition rules
+    starts = [event.start_time.ToDatetime() for event in resp.events]
+    assert starts == sorted(
+        [datetime.datetime(2023, 1, 1, 10) + datetime.timedelta(days=i) for i in range(14)] +
+        [datetime.datetime(2023, 1, 2, 12), datetime.datetime(2023, 1, 9, 12)] +
+        [datetime.datetime(2023, 1, 3, 14)]
+    )
+
+
+def test_stream(client: Server):
+    client.create_user('kek')
+    client.create_event('kek', start_time=datetime.datetime(
+        2023, 1, 1), end_time=datetime.datetime(2023, 1, 1, 1), repitition_rule=RepititionRule.DAILY)
+    events = client.list_events_stream('kek', since=datetime.datetime(
+        2023, 1, 1), till=datetime.datetime(2023, 1, 10))
+    resp = client.list_events('kek', since=datetime.datetime(
+        2023, 1, 1), till=datetime.datetime(2023, 1, 10))
+    assert events == list(resp.events)
+
+
+def test_stream_long_window(client: Server):
+    client.create_user('kek')
+    for hour in range(5):
+        client.create_event('kek', start_time=datetime.datetime(2022, 6, 1, hour), end_time=datetime.datetime(
+            2022, 6, 1, hour, 30), repitition_rule=RepititionRule.DAILY)
+    client.create_event('kek', start_time=datetime.datetime(2023, 1, 31, 2, 15), end_time=datetime.datetime(
+        2023, 1, 31, 3), repitition_rule=RepititionRule.MONTHLY)
+    client.create_event('kek', start_time=datetime.datetime(2023, 7, 1, 1, 45), end_time=datetime.datetime(
+        2023, 7, 1, 3), repitition_rule=RepititionRule.NONE)
+    since, till = datetime.datetime(2023, 1, 1), datetime.datetime(2025, 1, 1)
+    # Series are expanded over several chunks of the window
+    events = client.list_events_stream('kek', since=since, till=till)
+    starts = [event.start_time.ToDatetime() for event in events]
+    assert len(starts) == 5 * (till - since).days + 14 + 1
+    assert starts == sorted(starts)
+    assert events == list(client.list_events('kek', since=since, till=till).events)
+
+
+def test_wire_compatible(client: Server):
+    client.create_user('kek')
+    client.create_user('lol')
+    client.create_event('kek', start_time=datetime.datetime(1969, 12, 31, 23, 59, 59, 500000), end_time=datetime.datetime(
+        1970, 1, 1), repitition_rule=RepititionRule.NONE)
+    client.create_event('kek', start_time=datetime.datetime(1970, 1, 1, 10, 0, 0, 1), end_time=datetime.datetime(
+        1970, 1, 1, 11), repitition_rule=RepititionRule.DAILY, users=['lol'])
+    params = {'user': 'kek', 'since': datetime.datetime(
+        1969, 12, 31), 'till': datetime.datetime(1970, 1, 5)}
+
+    # Spliced responses are exactly what protobuf would produce
+    content = client.get('/list_events', params=params).content
+    resp = ListEventsResp.FromString(content)
+    assert len(resp.events) > 1
+    assert resp.SerializeToString() == content
+
+    content = client.get('/list_events', params={**params, 'limit': 3}).content
+    assert ListEventsResp.FromString(content).SerializeToString() == content
+
+    for frame in wire.iter_delimited(client.get('/list_events', params={**params, 'stream': 1}).content):
+        assert Event.FromString(frame).SerializeToString() == frame
+
+
+def test_merge_failed_source():
+    closed = []
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+            yield [1]
+        finally:
+            closed.append('slow')
+
+    async def failing():
+        try:
+            raise ValueError('Source failed')
+            yield [2]
+        finally:
+            closed.append('failing')
+
+    async def merge():
+        return [item async for item in handles.merge_chunks([slow(), failing()], key=lambda item: item)]
+
+    # The error of the source comes through and every source is closed
+    with pytest.raises(ValueError, match='Source failed'):
+        asyncio.run(merge())
+    assert sorted(closed) == ['failing', 'slow']
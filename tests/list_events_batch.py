@@ -0,0 +1,36 @@
+import datetime
+from tests.conftest import Server
+from proto.calendar_pb2 import RepititionRule
+
+
+def test_empty(client: Server):
+    client.create_user('kek')
+    resp = client.list_events_batch(['kek'], since=datetime.datetime(
+        2022, 1, 1), till=datetime.datetime(2022, 1, 10))
+    assert len(resp.events) == 0
+    assert [user.user for user in resp.users] == ['kek']
+    assert len(resp.users[0].events) == 0
+
+
+def test_grouped_per_user(client: Server):
+    for user in ['kek', 'lol', 'cheburek']:
+        client.create_user(user)
+    client.create_event('kek', start_time=datetime.datetime(2022, 1, 1, 10), end_time=datetime.datetime(
+        2022, 1, 1, 11), repitition_rule=RepititionRule.DAILY, users=['lol'])
+    client.create_event('lol', start_time=datetime.datetime(2022, 1, 2, 12), end_time=datetime.datetime(
+        2022, 1, 2, 13), repitition_rule=RepititionRule.NONE)
+    client.create_event('cheburek', start_time=datetime.datetime(2022, 1, 2, 12), end_time=datetime.datetime(
+        2022, 1, 2, 13), repitition_rule=RepititionRule.NONE, users=['kek'])
+
+    since, till = datetime.datetime(2022, 1, 1), datetime.datetime(2022, 1, 3)
+    resp = client.list_events_batch(['kek', 'lol', 'kek'], since=since, till=till)
+    # The shared daily meeting is expanded once
+    assert len(resp.events) == 4
+    assert [user.user for user in resp.users] == ['kek', 'lol']
+
+    for user in resp.users:
+        batch = sorted((resp.events[i].user, resp.events[i].start_time.ToDatetime())
+                       for i in user.events)
+        single = sorted((event.user, event.start_time.ToDatetime())
+                        for event in client.list_events(user.user, since=since, till=till).events)
+        assert batch == single
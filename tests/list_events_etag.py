@@ -0,0 +1,57 @@
+import datetime
+from starlette.testclient import TestClient
+from tests.conftest import Server
+from tests.create_events import make_event
+from proto.calendar_pb2 import RepititionRule
+
+
+def params(user: str):
+    return {'user': user, 'since': datetime.datetime(2022, 1, 1), 'till': datetime.datetime(2022, 1, 10)}
+
+
+def conditional_get(client: Server, params, etag: str):
+    # Not through Server.get, 304 doesn't count as a success for raise_for_status
+    return TestClient.get(client, '/list_events', params=params, headers={'If-None-Match': etag})
+
+
+def test_not_modified(client: Server):
+    client.create_user('kek')
+    client.create_event('kek', start_time=datetime.datetime(2022, 1, 1, 10), end_time=datetime.datetime(
+        2022, 1, 1, 11), repitition_rule=RepititionRule.DAILY)
+
+    etag = client.get('/list_events', params=params('kek')).headers['ETag']
+    resp = conditional_get(client, params('kek'), etag)
+    assert resp.status_code == 304
+    assert resp.headers['ETag'] == etag
+    assert resp.content == b''
+    assert resp.headers['X-DB-Queries'] == '1'
+
+    resp = conditional_get(
+        client, {**params('kek'), 'till': datetime.datetime(2022, 1, 11)}, etag)
+    assert resp.status_code == 200
+
+
+def test_changed_by_participation(client: Server):
+    client.create_user('kek')
+    client.create_user('lol')
+    etags = {user: client.get('/list_events', params=params(user)).headers['ETag']
+             for user in ['kek', 'lol']}
+
+    client.create_event('lol', start_time=datetime.datetime(2022, 1, 1, 10), end_time=datetime.datetime(
+        2022, 1, 1, 11), repitition_rule=RepititionRule.NONE, users=['kek'])
+    for user, etag in etags.items():
+        resp = conditional_get(client, params(user), etag)
+        assert resp.status_code == 200
+        assert resp.headers['ETag'] != etag
+
+
+def test_create_events_bumps_version(client: Server):
+    client.create_users(['kek', 'lol'])
+    etag = client.get('/list_events', params=params('lol')).headers['ETag']
+    client.create_event('kek', start_time=datetime.datetime(2022, 1, 1, 10), end_time=datetime.datetime(
+        2022, 1, 1, 11), repitition_rule=RepititionRule.NONE)
+    assert conditional_get(client, params('lol'), etag).status_code == 304
+
+    client.create_events([make_event('kek', datetime.datetime(2022, 1, 2, 10), datetime.datetime(
+        2022, 1, 2, 11), RepititionRule.NONE, users=['lol'])])
+    assert conditional_get(client, params('lol'), etag).status_code == 200
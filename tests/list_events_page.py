@@ -0,0 +1,75 @@
+import datetime
+from tests.conftest import Server
+from proto.calendar_pb2 import RepititionRule
+import pytest
+import httpx
+
+
+def all_pages(client: Server, user: str, since: datetime.datetime, till: datetime.datetime, limit: int):
+    pages, cursor = [], ''
+    while True:
+        resp = client.list_events_page(user, since, till, limit, cursor)
+        assert len(resp.events) <= limit
+        pages.append([(event.start_time.ToDatetime(), event.end_time.ToDatetime())
+                     for event in resp.events])
+        if not resp.next_cursor:
+            return pages
+        cursor = resp.next_cursor
+
+
+def test_pages(client: Server):
+    client.create_user('kek')
+    client.create_user('lol')
+    client.create_event('kek', start_time=datetime.datetime(2022, 1, 1, 10), end_time=datetime.datetime(
+        2022, 1, 1, 11), repitition_rule=RepititionRule.DAILY)
+    client.create_event('lol', start_time=datetime.datetime(2021, 12, 6, 10), end_time=datetime.datetime(
+        2021, 12, 6, 12), repitition_rule=RepititionRule.WEEKLY, users=['kek'])
+    for day in [3, 10, 10, 20]:
+        client.create_event('kek', start_time=datetime.datetime(2022, 1, day, 10), end_time=datetime.datetime(
+            2022, 1, day, 13), repitition_rule=RepititionRule.NONE)
+
+    since, till = datetime.datetime(2022, 1, 1), datetime.datetime(2022, 1, 31)
+    expected = sorted(
+        [(datetime.datetime(2022, 1, 1 + i, 10), datetime.datetime(2022, 1, 1 + i, 11)) for i in range(30)] +
+        [(datetime.datetime(2022, 1, 3 + 7 * i, 10), datetime.datetime(2022, 1, 3 + 7 * i, 12)) for i in range(4)] +
+        [(datetime.datetime(2022, 1, day, 10), datetime.datetime(2022, 1, day, 13)) for day in [3, 10, 10, 20]]
+    )
+    for limit in [1, 3, 7, 100]:
+        pages = all_pages(client, 'kek', since, till, limit)
+        assert all(len(page) == limit for page in pages[:-1])
+        assert sorted(sum(pages, [])) == expected
+        assert [start for page in pages for start, _ in page] == [start for start, _ in expected]
+
+
+def test_last_page(client: Server):
+    client.create_user('kek')
+    client.create_event('kek', start_time=datetime.datetime(2022, 1, 1, 10), end_time=datetime.datetime(
+        2022, 1, 1, 11), repitition_rule=RepititionRule.NONE)
+    resp = client.list_events_page('kek', datetime.datetime(
+        2022, 1, 1), datetime.datetime(2023, 1, 1), limit=1)
+    assert len(resp.events) == 1
+    assert resp.next_cursor == ''
+
+
+def test_window_end_excluded(client: Server):
+    client.create_user('kek')
+    client.create_event('kek', start_time=datetime.datetime(2022, 1, 1, 10), end_time=datetime.datetime(
+        2022, 1, 1, 11), repitition_rule=RepititionRule.DAILY)
+    client.create_event('kek', start_time=datetime.datetime(2022, 1, 3, 10), end_time=datetime.datetime(
+        2022, 1, 3, 11), repitition_rule=RepititionRule.NONE)
+    since, till = datetime.datetime(2022, 1, 1), datetime.datetime(2022, 1, 3, 10)
+    expected = [(event.start_time.ToDatetime(), event.end_time.ToDatetime())
+                for event in client.list_events('kek', since, till).events]
+    assert len(expected) == 2
+    for limit in [1, 100]:
+        assert sum(all_pages(client, 'kek', since, till, limit), []) == expected
+
+
+def test_broken_cursor(client: Server):
+    client.create_user('kek')
+    with pytest.raises(httpx.HTTPStatusError):
+        client.list_events_page('kek', datetime.datetime(
+            2022, 1, 1), datetime.datetime(2023, 1, 1), limit=1, cursor='kek')
+    with pytest.raises(httpx.HTTPStatusError):
+        client.list_events_page('kek', datetime.datetime(
+            2022, 1, 1), datetime.datetime(2023, 1, 1), limit=0)
@@ -0,0 +1,30 @@
+from tests.conftest import Server
+import pytest
+import httpx
+
+
+def scrape(client: Server):
+    samples = {}
+    for line in client.get('/metrics').text.splitlines():
+        if not line.startswith('#'):
+            name, value = line.rsplit(' ', 1)
+            samples[name] = float(value)
+    return samples
+
+
+def test_route_metrics(client: Server):
+    before = scrape(client)
+    client.ping()
+    client.create_user('kek')
+    with pytest.raises(httpx.HTTPStatusError):
+        client.create_user('kek')
+    after = scrape(client)
+
+    created = 'calendar_requests_total{route="/create_user",status="200"}'
+    conflict = 'calendar_requests_total{route="/create_user",status="409"}'
+    pings = 'calendar_request_duration_seconds_count{route="/ping"}'
+    assert after[created] - before.get(created, 0) == 1
+    assert after[conflict] - before.get(conflict, 0) == 1
+    assert after[pings] - before.get(pings, 0) == 1
+    assert after['calendar_requests_in_flight{route="/ping"}'] == 0
+    assert 'calendar_db_pool_size' in after
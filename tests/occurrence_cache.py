@@ -0,0 +1,78 @@
+import datetime
+from tests.conftest import Server, with_env
+from proto.calendar_pb2 import RepititionRule
+
+
+configured = with_env(OCCURRENCE_CACHE_MAX_BYTES=str(1 << 20))
+
+
+def cache_stats(client: Server):
+    lines = client.get('/cache_stats').text.splitlines()
+    return {name: int(value) for name, value in (line.split() for line in lines)}
+
+
+@configured
+def test_hits(configured_client: Server):
+    configured_client.create_user('kek')
+    configured_client.create_event('kek', start_time=datetime.datetime(
+        2023, 1, 2), end_time=datetime.datetime(2023, 1, 2, 1), repitition_rule=RepititionRule.DAILY)
+    for _ in range(2):
+        resp = configured_client.list_events('kek', since=datetime.datetime(
+            2023, 1, 2), till=datetime.datetime(2023, 1, 8, 23))
+        assert len(resp.events) == 7
+    stats = cache_stats(configured_client)
+    assert stats['occurrence_cache_misses'] == 1
+    assert stats['occurrence_cache_hits'] == 1
+
+
+@configured
+def test_invalidation(configured_client: Server):
+    configured_client.create_user('kek')
+    configured_client.create_user('lol')
+    resp = configured_client.list_events('lol', since=datetime.datetime(
+        2023, 1, 2), till=datetime.datetime(2023, 1, 9))
+    assert len(resp.events) == 0
+
+    configured_client.create_event('kek', start_time=datetime.datetime(2023, 1, 3), end_time=datetime.datetime(
+        2023, 1, 3, 1), repitition_rule=RepititionRule.NONE, users=['lol'])
+    resp = configured_client.list_events('lol', since=datetime.datetime(
+        2023, 1, 2), till=datetime.datetime(2023, 1, 9))
+    assert len(resp.events) == 1
+    assert resp.events[0].user == 'kek'
+    assert sorted(resp.events[0].participants) == ['kek', 'lol']
+
+
+@configured
+def test_find_the_gap(configured_client: Server):
+    configured_client.create_user('kek')
+    configured_client.create_user('lol')
+    configured_client.create_event('kek', start_time=datetime.datetime(2023, 1, 1), end_time=datetime.datetime(
+        2023, 1, 1, 1), repitition_rule=RepititionRule.NONE, users=['lol'])
+    configured_client.create_event('lol', start_time=datetime.datetime(2023, 1, 1, 1), end_time=datetime.datetime(
+        2023, 1, 1, 2), repitition_rule=RepititionRule.NONE)
+    resp = configured_client.find_the_gap(['kek', 'lol'], datetime.datetime(
+        2023, 1, 1), interval=datetime.timedelta(minutes=30))
+    assert resp.start_time.ToDatetime() == datetime.datetime(2023, 1, 1, 2)
+
+
+@configured
+def test_window_end_excluded(configured_client: Server):
+    configured_client.create_user('kek')
+    configured_client.create_event('kek', start_time=datetime.datetime(
+        2023, 1, 2, 10), end_time=datetime.datetime(2023, 1, 2, 11), repitition_rule=RepititionRule.DAILY)
+    resp = configured_client.list_events('kek', since=datetime.datetime(
+        2023, 1, 2), till=datetime.datetime(2023, 1, 4, 10))
+    assert [event.start_time.ToDatetime() for event in resp.events] == [
+        datetime.datetime(2023, 1, 2, 10), datetime.datetime(2023, 1, 3, 10)]
+
+
+@configured
+def test_ttl(configured_client: Server):
+    configured_client.create_user('kek')
+    configured_client.app.state.occurrence_cache.ttl = 0
+    for _ in range(2):
+        configured_client.list_events('kek', since=datetime.datetime(
+            2023, 1, 2), till=datetime.datetime(2023, 1, 8, 23))
+    stats = cache_stats(configured_client)
+    assert stats['occurrence_cache_hits'] == 0
+    assert stats['occurrence_cache_misses'] == 2
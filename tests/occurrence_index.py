@@ -0,0 +1,59 @@
+import datetime
+from tests.conftest import Server, with_env
+from tests.create_events import make_event
+from proto.calendar_pb2 import RepititionRule
+
+
+configured = with_env(OCCURRENCE_INDEX_HORIZON_DAYS='30')
+
+
+def tomorrow() -> datetime.datetime:
+    return datetime.datetime.combine(datetime.datetime.utcnow().date(), datetime.time()) + datetime.timedelta(days=1)
+
+
+@configured
+def test_covers_horizon(configured_client: Server):
+    index = configured_client.app.state.occurrence_index
+    assert index.covers(tomorrow(), tomorrow() + datetime.timedelta(days=7))
+    assert not index.covers(tomorrow(), tomorrow() + datetime.timedelta(days=60))
+
+
+@configured
+def test_create_event(configured_client: Server):
+    configured_client.create_user('kek')
+    configured_client.create_user('lol')
+    configured_client.create_event('kek', start_time=tomorrow() + datetime.timedelta(hours=10), end_time=tomorrow() +
+                                datetime.timedelta(hours=11), repitition_rule=RepititionRule.DAILY, users=['lol'])
+    for user in ['kek', 'lol']:
+        resp = configured_client.list_events(
+            user, since=tomorrow(), till=tomorrow() + datetime.timedelta(days=5))
+        assert sorted(event.start_time.ToDatetime() for event in resp.events) == [
+            tomorrow() + datetime.timedelta(days=i, hours=10) for i in range(5)]
+        for event in resp.events:
+            assert event.user == 'kek'
+            assert sorted(event.participants) == ['kek', 'lol']
+
+
+@configured
+def test_create_events(configured_client: Server):
+    configured_client.create_user('kek')
+    configured_client.create_events([
+        make_event('kek', tomorrow(), tomorrow() +
+                   datetime.timedelta(hours=1), RepititionRule.WEEKLY),
+        make_event('kek', tomorrow() + datetime.timedelta(hours=2), tomorrow() +
+                   datetime.timedelta(hours=3), RepititionRule.NONE),
+    ])
+    resp = configured_client.list_events(
+        'kek', since=tomorrow(), till=tomorrow() + datetime.timedelta(days=13))
+    assert sorted(event.start_time.ToDatetime() for event in resp.events) == [
+        tomorrow(), tomorrow() + datetime.timedelta(hours=2), tomorrow() + datetime.timedelta(days=7)]
+
+
+@configured
+def test_fallback_beyond_horizon(configured_client: Server):
+    configured_client.create_user('kek')
+    configured_client.create_event('kek', start_time=tomorrow(), end_time=tomorrow() +
+                                datetime.timedelta(hours=1), repitition_rule=RepititionRule.WEEKLY)
+    resp = configured_client.list_events(
+        'kek', since=tomorrow(), till=tomorrow() + datetime.timedelta(days=70))
+    assert len(resp.events) == 10
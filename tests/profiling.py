@@ -0,0 +1,33 @@
+import os
+import pstats
+from tests.conftest import Server, with_env
+
+
+configured = with_env(PROFILE_DIR='{tmp_path}', PROFILE_ALLOWED_CALLERS='testclient')
+
+
+@configured
+def test_profile_on_header(configured_client: Server, tmp_path):
+    configured_client.create_user('kek')
+    assert os.listdir(tmp_path) == []
+
+    resp = configured_client.get('/ping', headers={'X-Profile': '1'})
+    assert os.listdir(tmp_path) == [resp.headers['X-Profile']]
+    stats = pstats.Stats(str(tmp_path / resp.headers['X-Profile']))
+    assert any(func[2] == 'ping' for func in stats.stats)
+
+
+@configured
+def test_caller_not_allowed(configured_client: Server, tmp_path):
+    configured_client.app.state.profiler.allowed_callers = {'10.0.0.1'}
+    resp = configured_client.get('/ping', headers={'X-Profile': '1'})
+    assert 'X-Profile' not in resp.headers
+    assert os.listdir(tmp_path) == []
+
+
+@configured
+def test_sampling(configured_client: Server, tmp_path):
+    configured_client.app.state.profiler.sample_rate = 1.0
+    configured_client.ping()
+    configured_client.ping()
+    assert len(os.listdir(tmp_path)) == 2
@@ -0,0 +1,170 @@
+import datetime
+from tests.conftest import Server
+from tests.create_events import make_event
+from proto import calendar_pb2
+from src import recurrence
+from proto.calendar_pb2 import RepititionRule, Weekday
+import httpx
+import pytest
+
+
+def make_rule(user: str, start_time: datetime.datetime, repitition_rule: calendar_pb2.RepititionRule, until: datetime.datetime = None, **rule) -> calendar_pb2.Event:
+    event = make_event(user, start_time, start_time +
+                       datetime.timedelta(hours=1), repitition_rule)
+    for name, value in rule.items():
+        if name == 'repitition_weekdays':
+            event.repitition_weekdays.extend(value)
+        else:
+            setattr(event, name, value)
+    if until is not None:
+        event.repitition_until.FromDatetime(until)
+    return event
+
+
+def start_times(resp: calendar_pb2.ListEventsResp):
+    return [event.start_time.ToDatetime() for event in resp.events]
+
+
+def test_interval(client: Server):
+    client.create_user('kek')
+    client.create_events([make_rule('kek', datetime.datetime(
+        2023, 1, 1, 10), RepititionRule.DAILY, repitition_interval=3)])
+    resp = client.list_events('kek', since=datetime.datetime(
+        2023, 1, 5), till=datetime.datetime(2023, 1, 12))
+    assert start_times(resp) == [datetime.datetime(2023, 1, 7, 10), datetime.datetime(2023, 1, 10, 10)]
+
+
+def test_count(client: Server):
+    client.create_user('kek')
+    client.create_events([make_rule('kek', datetime.datetime(
+        2023, 1, 2, 10), RepititionRule.WEEKLY, repitition_count=3)])
+    resp = client.list_events('kek', since=datetime.datetime(
+        2023, 1, 1), till=datetime.datetime(2023, 3, 1))
+    assert start_times(resp) == [datetime.datetime(2023, 1, 2, 10), datetime.datetime(
+        2023, 1, 9, 10), datetime.datetime(2023, 1, 16, 10)]
+    resp = client.list_events('kek', since=datetime.datetime(
+        2023, 1, 17), till=datetime.datetime(2023, 1, 24))
+    assert len(resp.events) == 0
+
+
+def test_count_skips_missing_days(client: Server):
+    client.create_user('kek')
+    client.create_events([make_rule('kek', datetime.datetime(
+        2023, 1, 31, 10), RepititionRule.MONTHLY, repitition_count=3)])
+    resp = client.list_events('kek', since=datetime.datetime(
+        2023, 1, 1), till=datetime.datetime(2024, 1, 1))
+    assert start_times(resp) == [datetime.datetime(2023, 1, 31, 10), datetime.datetime(
+        2023, 3, 31, 10), datetime.datetime(2023, 5, 31, 10)]
+
+
+def test_until(client: Server):
+    client.create_user('kek')
+    client.create_events([make_rule('kek', datetime.datetime(
+        2023, 1, 15, 10), RepititionRule.MONTHLY, until=datetime.datetime(2023, 3, 15, 10))])
+    resp = client.list_events('kek', since=datetime.datetime(
+        2023, 1, 1), till=datetime.datetime(2023, 6, 1))
+    assert start_times(resp) == [datetime.datetime(2023, 1, 15, 10), datetime.datetime(
+        2023, 2, 15, 10), datetime.datetime(2023, 3, 15, 10)]
+
+
+def test_weekdays(client: Server):
+    client.create_user('kek')
+    # Tuesday, the first occurrence is on Wednesday
+    client.create_events([make_rule('kek', datetime.datetime(2023, 1, 3, 10), RepititionRule.WEEKLY, repitition_interval=2,
+                                    repitition_weekdays=[Weekday.MONDAY, Weekday.WEDNESDAY, Weekday.FRIDAY])])
+    resp = client.list_events('kek', since=datetime.datetime(
+        2023, 1, 1), till=datetime.datetime(2023, 1, 22))
+    assert start_times(resp) == [datetime.datetime(2023, 1, 4, 10), datetime.datetime(2023, 1, 6, 10), datetime.datetime(
+        2023, 1, 16, 10), datetime.datetime(2023, 1, 18, 10), datetime.datetime(2023, 1, 20, 10)]
+
+    # Days of week other than the one of the start time are not pruned
+    resp = client.list_events('kek', since=datetime.datetime(
+        2023, 1, 18), till=datetime.datetime(2023, 1, 19))
+    assert start_times(resp) == [datetime.datetime(2023, 1, 18, 10)]
+
+
+def test_old_series(client: Server):
+    client.create_user('kek')
+    client.create_events([make_rule('kek', datetime.datetime(
+        1904, 2, 29, 10), RepititionRule.YEARLY, repitition_interval=4)])
+    resp = client.list_events('kek', since=datetime.datetime(
+        2023, 1, 1), till=datetime.datetime(2025, 1, 1))
+    assert start_times(resp) == [datetime.datetime(2024, 2, 29, 10)]
+
+
+def test_weekdays_of_daily_rule(client: Server):
+    client.create_user('kek')
+    resp = client.create_events([make_rule('kek', datetime.datetime(
+        2023, 1, 1, 10), RepititionRule.DAILY, repitition_weekdays=[Weekday.MONDAY])])
+    assert not resp.results[0].ok
+    assert resp.results[0].error == 'Days of week are supported by weekly repitition only'
+
+
+def test_unknown_weekday(client: Server):
+    client.create_user('kek')
+    event = make_rule('kek', datetime.datetime(2023, 1, 2, 10), RepititionRule.WEEKLY,
+                      repitition_count=3, repitition_weekdays=[9])
+    resp = client.create_events([event, make_rule('kek', datetime.datetime(
+        2023, 1, 2, 10), RepititionRule.WEEKLY, repitition_count=3)])
+    assert not resp.results[0].ok
+    assert resp.results[0].error == 'Unknown day of week: 9'
+    assert resp.results[1].ok
+
+    with pytest.raises(httpx.HTTPStatusError) as e:
+        client.post('/create_event', content=event.SerializeToString())
+    assert e.value.response.status_code == 400
+
+
+def test_sync(client: Server):
+    client.create_user('kek')
+    client.create_events([make_rule('kek', datetime.datetime(2023, 1, 3, 10), RepititionRule.WEEKLY, until=datetime.datetime(2023, 6, 1),
+                                    repitition_interval=2, repitition_count=5, repitition_weekdays=[Weekday.FRIDAY, Weekday.MONDAY])])
+    event = client.sync_events('kek').events[0]
+    assert event.repitition_interval == 2
+    assert event.repitition_count == 5
+    assert event.repitition_until.ToDatetime() == datetime.datetime(2023, 6, 1)
+    assert list(event.repitition_weekdays) == [Weekday.MONDAY, Weekday.FRIDAY]
+
+
+def test_ended_series_are_not_fetched(client: Server):
+    client.create_user('kek')
+    client.create_events([
+        make_rule('kek', datetime.datetime(2022, 1, 1, 10),
+                  RepititionRule.DAILY, repitition_count=3),
+        make_rule('kek', datetime.datetime(2022, 1, 1, 10), RepititionRule.WEEKLY,
+                  until=datetime.datetime(2022, 6, 1)),
+        make_rule('kek', datetime.datetime(2022, 1, 1, 10), RepititionRule.NONE),
+    ])
+    resp = client.get('/list_events', params={'user': 'kek', 'since': datetime.datetime(
+        2023, 1, 1), 'till': datetime.datetime(2023, 1, 8)})
+    assert len(calendar_pb2.ListEventsResp.FromString(resp.content).events) == 0
+    # Only the user version
+    assert resp.headers['X-DB-Rows'] == '1'
+
+
+def test_until_before_start(client: Server):
+    client.create_user('kek')
+    resp = client.create_events([make_rule('kek', datetime.datetime(
+        2023, 1, 1, 10), RepititionRule.DAILY, until=datetime.datetime(2022, 1, 1))])
+    assert not resp.results[0].ok
+    assert resp.results[0].error == 'Repitition ends before the event starts'
+
+
+def test_interval_too_long(client: Server):
+    client.create_user('kek')
+    event = make_rule('kek', datetime.datetime(2023, 1, 1, 10), RepititionRule.DAILY,
+                      repitition_interval=4_000_000_000)
+    resp = client.create_events([event, make_rule('kek', datetime.datetime(
+        2023, 1, 1, 10), RepititionRule.WEEKLY, repitition_interval=recurrence.MAX_INTERVAL)])
+    assert not resp.results[0].ok
+    assert resp.results[0].error == 'Repitition interval is too long: 4000000000'
+    assert resp.results[1].ok
+
+    with pytest.raises(httpx.HTTPStatusError) as e:
+        client.post('/create_event', content=event.SerializeToString())
+    assert e.value.response.status_code == 400
+
+    # The longest interval still has its first occurrence
+    resp = client.list_events('kek', since=datetime.datetime(
+        2023, 1, 1), till=datetime.datetime(2023, 1, 2))
+    assert start_times(resp) == [datetime.datetime(2023, 1, 1, 10)]
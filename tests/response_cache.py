@@ -0,0 +1,54 @@
+import datetime
+from tests.conftest import Server, with_env
+from tests.occurrence_cache import cache_stats
+from proto.calendar_pb2 import ListEventsResp, RepititionRule
+
+
+configured = with_env(RESPONSE_CACHE_MAX_BYTES=str(1 << 20))
+
+
+def params(user: str):
+    return {'user': user, 'since': datetime.datetime(2023, 1, 2), 'till': datetime.datetime(2023, 1, 8, 23)}
+
+
+@configured
+def test_hits(configured_client: Server):
+    configured_client.create_user('kek')
+    configured_client.create_event('kek', start_time=datetime.datetime(
+        2023, 1, 2), end_time=datetime.datetime(2023, 1, 2, 1), repitition_rule=RepititionRule.DAILY)
+
+    first = configured_client.get('/list_events', params=params('kek'))
+    second = configured_client.get('/list_events', params=params('kek'))
+    assert second.content == first.content
+    assert second.headers['ETag'] == first.headers['ETag']
+    assert second.headers['X-DB-Queries'] == '0'
+
+    stats = cache_stats(configured_client)
+    assert stats['response_cache_misses'] == 1
+    assert stats['response_cache_hits'] == 1
+    assert stats['response_cache_bytes'] > len(first.content)
+
+
+@configured
+def test_invalidated_by_participation(configured_client: Server):
+    configured_client.create_user('kek')
+    configured_client.create_user('lol')
+    configured_client.get('/list_events', params=params('kek'))
+
+    configured_client.create_event('lol', start_time=datetime.datetime(
+        2023, 1, 3), end_time=datetime.datetime(2023, 1, 3, 1), repitition_rule=RepititionRule.NONE, users=['kek'])
+    resp = configured_client.get('/list_events', params=params('kek'))
+    assert resp.headers['X-DB-Queries'] != '0'
+    assert len(ListEventsResp.FromString(resp.content).events) == 1
+    assert cache_stats(configured_client)['response_cache_hits'] == 0
+
+
+@configured
+def test_ttl(configured_client: Server):
+    configured_client.create_user('kek')
+    configured_client.app.state.response_cache.ttl = 0
+    configured_client.get('/list_events', params=params('kek'))
+    configured_client.get('/list_events', params=params('kek'))
+    stats = cache_stats(configured_client)
+    assert stats['response_cache_hits'] == 0
+    assert stats['response_cache_misses'] == 2
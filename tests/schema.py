@@ -0,0 +1,66 @@
+import datetime
+from tests.conftest import Server
+from proto.calendar_pb2 import RepititionRule
+from src import datamodel
+import sqlalchemy
+import pytest
+import httpx
+
+
+def test_restart_keeps_data(postgres):
+    with Server() as server:
+        server.create_user('kek')
+        server.create_event('kek', start_time=datetime.datetime(
+            2023, 1, 1), end_time=datetime.datetime(2023, 1, 1, 1), repitition_rule=RepititionRule.NONE)
+    with Server() as server:
+        with pytest.raises(httpx.HTTPStatusError) as e:
+            server.create_user('kek')
+        assert e.value.response.status_code == 409
+        resp = server.list_events('kek', since=datetime.datetime(
+            2023, 1, 1), till=datetime.datetime(2023, 1, 2))
+        assert len(resp.events) == 1
+
+
+def test_applies_missing_ddl(postgres):
+    with Server() as server:
+        server.create_user('kek')
+        server.create_event('kek', start_time=datetime.datetime(
+            2023, 1, 2), end_time=datetime.datetime(2023, 1, 2, 1), repitition_rule=RepititionRule.WEEKLY)
+
+    engine = sqlalchemy.create_engine(postgres)
+    with engine.begin() as conn:
+        conn.execute(sqlalchemy.text('DROP INDEX ix_events_rule_day_of_week_start_time'))
+        conn.execute(sqlalchemy.text('ALTER TABLE events DROP COLUMN start_day_of_week'))
+        conn.execute(sqlalchemy.text('DROP TABLE schema_version'))
+
+    with Server() as server:
+        resp = server.list_events('kek', since=datetime.datetime(
+            2023, 1, 9), till=datetime.datetime(2023, 1, 10))
+        assert len(resp.events) == 1
+
+    inspector = sqlalchemy.inspect(engine)
+    assert 'start_day_of_week' in {column['name'] for column in inspector.get_columns('events')}
+    assert 'ix_events_rule_day_of_week_start_time' in {index['name'] for index in inspector.get_indexes('events')}
+    engine.dispose()
+
+
+def test_pool_warmup(postgres, monkeypatch):
+    monkeypatch.setenv('DATABASE_POOL_WARMUP', '3')
+    with Server() as server:
+        assert server.app.state.db.kw['bind'].pool.checkedin() == 3
+
+
+def test_newer_schema_is_kept(postgres):
+    with Server():
+        pass
+    engine = sqlalchemy.create_engine(postgres)
+    with engine.begin() as conn:
+        conn.execute(sqlalchemy.update(datamodel.SchemaVersion).values(
+            version=datamodel.SCHEMA_VERSION + 1))
+
+    # An older worker neither upgrades nor downgrades the stored version
+    with Server() as server:
+        server.create_user('kek')
+    with engine.begin() as conn:
+        assert conn.scalar(sqlalchemy.select(datamodel.SchemaVersion.version)) == datamodel.SCHEMA_VERSION + 1
+    engine.dispose()
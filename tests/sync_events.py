@@ -0,0 +1,47 @@
+import datetime
+from tests.conftest import Server
+from proto.calendar_pb2 import RepititionRule
+import pytest
+import httpx
+
+
+def test_initial_sync(client: Server):
+    client.create_user('kek')
+    client.create_user('lol')
+    client.create_event('kek', start_time=datetime.datetime(2022, 1, 1, 10), end_time=datetime.datetime(
+        2022, 1, 1, 11), repitition_rule=RepititionRule.WEEKLY, users=['lol'])
+    client.create_event('lol', start_time=datetime.datetime(2022, 1, 2, 10), end_time=datetime.datetime(
+        2022, 1, 2, 11), repitition_rule=RepititionRule.NONE)
+
+    resp = client.sync_events('kek')
+    assert resp.sync_token
+    assert len(resp.events) == 1
+    event = resp.events[0]
+    assert event.id
+    assert event.user == 'kek'
+    assert event.repitition_rule == RepititionRule.WEEKLY
+    assert event.start_time.ToDatetime() == datetime.datetime(2022, 1, 1, 10)
+    assert sorted(event.participants) == ['kek', 'lol']
+
+
+def test_delta(client: Server):
+    client.create_user('kek')
+    client.create_user('lol')
+    client.create_event('kek', start_time=datetime.datetime(2022, 1, 1, 10), end_time=datetime.datetime(
+        2022, 1, 1, 11), repitition_rule=RepititionRule.NONE)
+    token = client.sync_events('kek').sync_token
+
+    assert len(client.sync_events('kek', token).events) == 0
+
+    client.create_event('lol', start_time=datetime.datetime(2022, 1, 3, 10), end_time=datetime.datetime(
+        2022, 1, 3, 11), repitition_rule=RepititionRule.DAILY, users=['kek'])
+    resp = client.sync_events('kek', token)
+    assert [(event.user, event.start_time.ToDatetime()) for event in resp.events] == [
+        ('lol', datetime.datetime(2022, 1, 3, 10))]
+    assert len(client.sync_events('kek', resp.sync_token).events) == 0
+
+
+def test_broken_token(client: Server):
+    client.create_user('kek')
+    with pytest.raises(httpx.HTTPStatusError):
+        client.sync_events('kek', 'kek')